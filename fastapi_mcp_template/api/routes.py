@@ -1,244 +1,263 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Request
-from fastapi.responses import JSONResponse
-from typing import Dict, Any, Optional, List
-import json
+from fastapi.responses import Response, StreamingResponse
+from typing import Dict, Any, Optional, List, Callable, Awaitable, AsyncIterator
+import inspect
+import logging
+import orjson
+import time
 import uuid
-from datetime import datetime
 
 from fastapi_mcp_template.core.tool_manager import ToolManager
+from fastapi_mcp_template.api.responses import ORJSONResponse
+from fastapi_mcp_template.api.sessions import create_session_store
+from fastapi_mcp_template.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+MCP_PROTOCOL_VERSION = "2024-11-05"
+
+# Static response fragments, built once and shared by every response
+_INIT_CAPABILITIES = {"tools": {"listChanged": True}}
+
+
+def _err(request_id: Any, code: int, message: str, data: Any = None) -> bytes:
+    """Build a serialized JSON-RPC error response."""
+    error = {"code": code, "message": message}
+    if data is not None:
+        error["data"] = data
+    return orjson.dumps({"jsonrpc": "2.0", "id": request_id, "error": error})
+
+
+def _mcp_response(content: bytes, session_id: Optional[str] = None) -> Response:
+    """Wrap serialized JSON-RPC content in a response carrying the session header."""
+    return Response(
+        content=content,
+        media_type="application/json",
+        headers={"Mcp-Session-Id": session_id if session_id else ""}
+    )
+
+
+async def _mcp_wrap(request_id: Any, chunks: AsyncIterator[Any]) -> AsyncIterator[bytes]:
+    """Stream a tool's async generator output as a single MCP text content result."""
+    yield b'{"jsonrpc":"2.0","id":' + orjson.dumps(request_id) + b',"result":{"content":[{"type":"text","text":"'
+    try:
+        async for chunk in chunks:
+            if isinstance(chunk, bytes):
+                chunk = chunk.decode("utf-8", errors="replace")
+            elif not isinstance(chunk, str):
+                chunk = str(chunk)
+            # Emit the JSON-escaped chunk without its surrounding quotes
+            yield orjson.dumps(chunk)[1:-1]
+    except Exception as e:
+        # Headers are already sent, so report the failure inside the result
+        yield orjson.dumps(f"\nTool execution failed: {str(e)}")[1:-1]
+        yield b'"}],"isError":true}}'
+        return
+    yield b'"}]}}'
+
+
+async def _collect_stream(chunks: AsyncIterator[Any]) -> str:
+    """Collect a tool's async generator output into one string."""
+    parts = []
+    async for chunk in chunks:
+        if isinstance(chunk, bytes):
+            chunk = chunk.decode("utf-8", errors="replace")
+        parts.append(chunk if isinstance(chunk, str) else str(chunk))
+    return "".join(parts)
 
-# Session storage (in production, use Redis or similar)
-active_sessions = {}
 
 def create_dynamic_routes(app, tool_manager: ToolManager) -> None:
     """Create dynamic routes for all registered tools."""
+    settings = get_settings()
+    server_info = {"name": settings.mcp_server_name, "version": settings.mcp_server_version}
     
-    def get_or_create_session(request: Request, method: str = None) -> tuple:
-        """Get or create a session ID for the client."""
+    # Session storage (in-memory by default, Redis when FTMD_REDIS_URL is set)
+    session_store = create_session_store(settings)
+    app.state.session_store = session_store
+    
+    async def get_or_create_session(request: Request, method: str = None) -> tuple:
+        """Get or create a session for the client, returning its ID and record."""
         # For initialize requests, always create new session
         if method == "initialize":
-            session_id = str(uuid.uuid4())
-            active_sessions[session_id] = {
-                "created": datetime.now(),
+            session_id = uuid.uuid4().hex
+            session = {
+                "created": time.time(),
                 "initialized": False,
-                "protocol_version": "2024-11-05"
+                "protocol_version": MCP_PROTOCOL_VERSION
             }
-            return session_id, True
-          # For other requests, get from Mcp-Session-Id header
+            await session_store.create(session_id, session)
+            return session_id, session
+        # For other requests, get from Mcp-Session-Id header
         session_id = request.headers.get("mcp-session-id")
         
         if not session_id:
-            return None, False
+            return None, None
+        
+        # A single lookup; None when the session does not exist or has expired
+        return session_id, await session_store.get(session_id)
+
+    # MCP method handlers
+    async def handle_initialize(request_id: Any, params: Dict[str, Any], session_id: str) -> Response:
+        """Handle the initialize request."""
+        logger.debug("Processing initialize request for session: %s", session_id)
+        # Create new session and mark as initialized immediately
+        await session_store.update(session_id, initialized=True)  # Mark as initialized right away for compatibility
+        logger.debug("Session %s marked as initialized", session_id)
+        
+        # Response with proper capabilities declaration (tools are fetched separately)
+        response_data = {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "result": {
+                "protocolVersion": MCP_PROTOCOL_VERSION,
+                "capabilities": _INIT_CAPABILITIES,
+                "serverInfo": server_info
+            }
+        }
+        
+        logger.info("Initialize response: %d tools available", len(tool_manager.registered_tools))
+        
+        return ORJSONResponse(content=response_data, headers={"Mcp-Session-Id": session_id})
+    
+    async def handle_initialized_notification(request_id: Any, params: Dict[str, Any],
+                                              session_id: Optional[str]) -> Response:
+        """Handle the initialized notification (no response expected for notifications)."""
+        if session_id and await session_store.exists(session_id):
+            await session_store.update(session_id, initialized=True)
+        # Notifications return 202 Accepted with no content, even when they fail (per MCP spec)
+        return ORJSONResponse(content=None, status_code=202)
+    
+    async def handle_tools_list(request_id: Any, params: Dict[str, Any], session_id: str) -> Response:
+        """Handle tools/list by splicing the cached, pre-serialized tool list into the envelope."""
+        content = (
+            b'{"jsonrpc":"2.0","id":' + orjson.dumps(request_id) +
+            b',"result":{"tools":' + tool_manager.get_mcp_tool_definitions_bytes() + b'}}'
+        )
+        return _mcp_response(content, session_id)
+    
+    async def handle_tools_call(request_id: Any, params: Dict[str, Any], session_id: str) -> Response:
+        """Handle tools/call by executing the requested tool."""
+        tool_name = params.get("name")
+        arguments = params.get("arguments", {})
+        
+        try:
+            result = await tool_manager.execute_tool(tool_name, **arguments)
             
-        if session_id not in active_sessions:
-            return session_id, False
+            if inspect.isasyncgen(result):
+                return StreamingResponse(
+                    _mcp_wrap(request_id, result),
+                    media_type="application/json",
+                    headers={"Mcp-Session-Id": session_id}
+                )
             
-        return session_id, True
-
-    # MCP Protocol endpoints
+            # Format result as MCP content
+            result_text = str(result) if not isinstance(result, str) else result
+            
+            response_data = {
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "result": {
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": result_text
+                        }
+                    ]
+                }
+            }
+            
+        except Exception as e:
+            # Tool execution errors should be returned as successful JSON-RPC responses
+            # with isError flag, not as JSON-RPC errors (per MCP spec)
+            response_data = {
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "result": {
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": f"Tool execution failed: {str(e)}"
+                        }
+                    ],
+                    "isError": True
+                }
+            }
+        
+        return ORJSONResponse(content=response_data, headers={"Mcp-Session-Id": session_id})
+    
+    method_handlers: Dict[str, Callable[[Any, Dict[str, Any], Optional[str]], Awaitable[Response]]] = {
+        "initialize": handle_initialize,
+        "notifications/initialized": handle_initialized_notification,
+        "tools/list": handle_tools_list,
+        "tools/call": handle_tools_call,
+    }
+    
+    # Methods that may be called before the session is initialized
+    session_free_methods = {"initialize", "notifications/initialized"}
+    
+    # MCP Protocol endpoints (also served on the root path as a fallback)
     @app.post("/mcp")
+    @app.post("/")
     async def mcp_endpoint(request: Request, payload: Dict[str, Any]):
         """Main MCP protocol endpoint."""
-        import logging
-        logger = logging.getLogger(__name__)
-        
         try:
             method = payload.get("method")
             params = payload.get("params", {})
             request_id = payload.get("id")
             
-            logger.info(f"MCP endpoint called - Method: {method}, Request ID: {request_id}")
-            logger.info(f"Request payload: {payload}")
+            logger.debug("MCP endpoint called - Method: %s, Request ID: %s", method, request_id)
+            logger.debug("Request payload: %s", payload)
             
-            session_id, session_exists = get_or_create_session(request, method)
-            logger.info(f"Session ID: {session_id}, Session exists: {session_exists}")
-            
-            if method == "initialize":
-                logger.info(f"Processing initialize request for session: {session_id}")
-                # Create new session and mark as initialized immediately
-                active_sessions[session_id]["initialized"] = True  # Mark as initialized right away for compatibility
-                logger.info(f"Session {session_id} marked as initialized")
-                  # Get available tools from tool manager for reference (not returned in initialize)
-                tool_count = len(tool_manager.registered_tools)
-                
-                # Response with proper capabilities declaration (tools are fetched separately)
-                response_data = {
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "result": {
-                        "protocolVersion": "2024-11-05",
-                        "capabilities": {
-                            "tools": {
-                                "listChanged": True
-                            }
-                        },
-                        "serverInfo": {
-                            "name": "fastapi_mcp_template",
-                            "version": "1.0.0"
-                        }
-                    }
-                }
-                
-                logger.info(f"Initialize response: {tool_count} tools available")
-                
-                return JSONResponse(
-                    content=response_data,
-                    headers={
-                        "Mcp-Session-Id": session_id,
-                        "Content-Type": "application/json"
-                    }
+            # Liveness probe: answered without touching the session store
+            if method == "ping":
+                return _mcp_response(
+                    b'{"jsonrpc":"2.0","id":' + orjson.dumps(request_id) + b',"result":{}}',
+                    request.headers.get("mcp-session-id")
                 )
             
-            elif method == "notifications/initialized":
-                # Handle initialized notification (no response expected for notifications)
-                if session_id and session_id in active_sessions:
-                    active_sessions[session_id]["initialized"] = True
-                    # Notifications should return 202 Accepted with no content (per MCP spec)
-                    return JSONResponse(content=None, status_code=202)
-                else:
-                    # Even for failed notifications, return 202 (per MCP spec)
-                    return JSONResponse(content=None, status_code=202)
+            session_id, session = await get_or_create_session(request, method)
+            logger.debug("Session ID: %s, Session exists: %s", session_id, session is not None)
             
             # For all other methods, check session and initialization
-            if not session_id or not session_exists:
-                response_data = {
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "error": {
-                        "code": -32002,
-                        "message": "Server not initialized - session not found"
-                    }
-                }
-            elif not active_sessions.get(session_id, {}).get("initialized", False):
-                response_data = {
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "error": {
-                        "code": -32002,
-                        "message": "Server not initialized"
-                    }
-                }
-            elif method == "tools/list":
-                # Get tool info from the tool manager's registered tools
-                tool_definitions = []
-                for tool_name, tool_info in tool_manager.registered_tools.items():
-                    tool_definition = tool_info["definition"]
-                    tool_instance = tool_info["instance"]
-                    schema = tool_instance.get_schema()
-                    
-                    tool_definitions.append({
-                        "name": tool_definition.name,
-                        "description": tool_definition.description,
-                        "inputSchema": schema.to_dict() if hasattr(schema, 'to_dict') else schema
-                    })
-                
-                response_data = {
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "result": {
-                        "tools": tool_definitions
-                    }                }
+            if method not in session_free_methods:
+                if session is None:
+                    return _mcp_response(
+                        _err(request_id, -32002, "Server not initialized - session not found"),
+                        session_id
+                    )
+                if not session.get("initialized", False):
+                    return _mcp_response(_err(request_id, -32002, "Server not initialized"), session_id)
             
-            elif method == "tools/call":
-                tool_name = params.get("name")
-                arguments = params.get("arguments", {})
-                
-                try:
-                    result = await tool_manager.execute_tool(tool_name, **arguments)
-                    
-                    # Format result as MCP content
-                    result_text = str(result) if not isinstance(result, str) else result
-                    
-                    response_data = {
-                        "jsonrpc": "2.0",
-                        "id": request_id,
-                        "result": {
-                            "content": [
-                                {
-                                    "type": "text",
-                                    "text": result_text
-                                }
-                            ]
-                        }
-                    }
-                    
-                except Exception as e:
-                    # Tool execution errors should be returned as successful JSON-RPC responses
-                    # with isError flag, not as JSON-RPC errors (per MCP spec)
-                    response_data = {
-                        "jsonrpc": "2.0",
-                        "id": request_id,
-                        "result": {
-                            "content": [
-                                {
-                                    "type": "text",
-                                    "text": f"Tool execution failed: {str(e)}"
-                                }
-                            ],
-                            "isError": True
-                        }
-                    }
-                
-            elif method == "ping":
-                response_data = {
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "result": {}
-                }
-            
-            else:
-                response_data = {
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "error": {
-                        "code": -32601,
-                        "message": f"Method not found: {method}"
-                    }
-                }
+            handler = method_handlers.get(method)
+            if handler is None:
+                return _mcp_response(_err(request_id, -32601, f"Method not found: {method}"), session_id)
             
-            # Return response with session ID header
-            return JSONResponse(
-                content=response_data,
-                headers={
-                    "Mcp-Session-Id": session_id if session_id else "",
-                    "content-type": "application/json"
-                }
-            )
+            return await handler(request_id, params, session_id)
                 
         except Exception as e:
-            return JSONResponse(
-                content={
-                    "jsonrpc": "2.0",
-                    "id": payload.get("id"),
-                    "error": {
-                        "code": -32603,
-                        "message": "Internal error",
-                        "data": str(e)
-                    }
-                },
-                headers={"content-type": "application/json"}
+            return Response(
+                content=_err(payload.get("id"), -32603, "Internal error", str(e)),
+                media_type="application/json"
             )
     
-    @app.post("/")
-    async def root_mcp_endpoint(request: Request, payload: Dict[str, Any]):
-        """Root MCP endpoint (fallback)."""
-        return await mcp_endpoint(request, payload)
-    
-    @app.post("/mcp/tools/{tool_name}")
+    @app.post("/mcp/tools/{tool_name}", response_class=ORJSONResponse)
     async def execute_mcp_tool(tool_name: str, payload: Dict[str, Any]):
         """Execute MCP tool endpoint."""
         try:
             result = await tool_manager.execute_tool(tool_name, **payload)
-            return {
+            if inspect.isasyncgen(result):
+                result = await _collect_stream(result)
+            # Returned as a response so that large results skip FastAPI's jsonable_encoder pass
+            return ORJSONResponse(content={
                 "success": True,
                 "result": result
-            }
+            })
         except ValueError as e:
             raise HTTPException(status_code=404, detail=str(e))
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
     
-    @app.get("/api/tools/{tool_name}/schema")
+    @app.get("/api/tools/{tool_name}/schema", response_class=ORJSONResponse)
     async def get_tool_schema(tool_name: str):
         """Get tool parameter schema."""
         try:
@@ -247,7 +266,7 @@ def create_dynamic_routes(app, tool_manager: ToolManager) -> None:
         except ValueError as e:
             raise HTTPException(status_code=404, detail=str(e))
     
-    @app.post("/api/tools/{tool_name}")
+    @app.post("/api/tools/{tool_name}", response_class=ORJSONResponse)
     async def execute_rest_tool(
         tool_name: str,
         file: Optional[UploadFile] = File(None),
@@ -258,32 +277,40 @@ def create_dynamic_routes(app, tool_manager: ToolManager) -> None:
             # Parse parameters
             kwargs = {}
             if params:
-                kwargs = json.loads(params)
+                kwargs = orjson.loads(params)
             
             # Handle file upload
             if file:
-                file_content = await file.read()
-                kwargs['file_content'] = file_content
+                if tool_manager.tool_accepts_file_stream(tool_name):
+                    # Hand over the spooled upload (spilled to disk when large) instead of
+                    # reading the whole body into memory
+                    kwargs['file_stream'] = file.file
+                else:
+                    kwargs['file_content'] = await file.read()
                 kwargs['filename'] = file.filename
                 kwargs['content_type'] = file.content_type
             
             result = await tool_manager.execute_tool(tool_name, **kwargs)
-            return {
+            if inspect.isasyncgen(result):
+                result = await _collect_stream(result)
+            # Returned as a response so that large results skip FastAPI's jsonable_encoder pass
+            return ORJSONResponse(content={
                 "success": True,
                 "result": result
-            }
+            })
+        except orjson.JSONDecodeError:
+            # Subclass of ValueError, so it has to be caught first
+            raise HTTPException(status_code=400, detail="Invalid JSON in params")
         except ValueError as e:
             raise HTTPException(status_code=404, detail=str(e))
-        except json.JSONDecodeError:
-            raise HTTPException(status_code=400, detail="Invalid JSON in params")
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
     
     @app.get("/mcp/session")
     async def get_session(request: Request):
         """Get or create a session for MCP protocol."""
-        session_id, _ = get_or_create_session(request, "initialize")
-        return JSONResponse(
+        session_id, _ = await get_or_create_session(request, "initialize")
+        return ORJSONResponse(
             content={"session_id": session_id},
             headers={"Mcp-Session-Id": session_id}
         )
@@ -291,7 +318,7 @@ def create_dynamic_routes(app, tool_manager: ToolManager) -> None:
     @app.options("/mcp")
     async def mcp_options():
         """Handle CORS preflight for MCP endpoint."""
-        return JSONResponse(
+        return ORJSONResponse(
             content={},
             headers={
                 "Access-Control-Allow-Origin": "*",
@@ -304,7 +331,7 @@ def create_dynamic_routes(app, tool_manager: ToolManager) -> None:
     @app.options("/")
     async def root_options():
         """Handle CORS preflight for root endpoint."""
-        return JSONResponse(
+        return ORJSONResponse(
             content={},
             headers={
                 "Access-Control-Allow-Origin": "*",
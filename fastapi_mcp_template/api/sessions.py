@@ -0,0 +1,137 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+import orjson
+
+try:
+    import redis.asyncio as redis
+except ImportError:
+    redis = None
+
+
+class InMemorySessionStore:
+    """Process-local session store (sessions are not shared between workers).
+    
+    Sessions expire after ``ttl`` seconds without being accessed, and the least
+    recently used sessions are evicted once ``max_sessions`` is exceeded.
+    """
+
+    def __init__(self, ttl: int = 3600, max_sessions: int = 10000):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        # session_id -> (expires_at, data), kept in least-recently-used order
+        self.sessions: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    def _get_entry(self, session_id: str) -> Optional[Tuple[float, Dict[str, Any]]]:
+        entry = self.sessions.get(session_id)
+        if entry is None:
+            return None
+        now = time.monotonic()
+        if entry[0] <= now:
+            del self.sessions[session_id]
+            return None
+        # Every access counts as activity, so the idle timeout restarts
+        entry = (now + self.ttl, entry[1])
+        self.sessions[session_id] = entry
+        self.sessions.move_to_end(session_id)
+        return entry
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        while self.sessions:
+            session_id, (expires_at, _) = next(iter(self.sessions.items()))
+            if expires_at > now and len(self.sessions) <= self.max_sessions:
+                break
+            del self.sessions[session_id]
+
+    async def create(self, session_id: str, data: Dict[str, Any]) -> None:
+        """Store a new session record."""
+        self.sessions[session_id] = (time.monotonic() + self.ttl, data)
+        self.sessions.move_to_end(session_id)
+        self._evict()
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Get a session record, or None if it does not exist or has expired."""
+        entry = self._get_entry(session_id)
+        return entry[1] if entry is not None else None
+
+    async def update(self, session_id: str, **fields: Any) -> None:
+        """Update fields of an existing session record and refresh its TTL."""
+        entry = self._get_entry(session_id)
+        if entry is not None:
+            entry[1].update(fields)
+
+    async def exists(self, session_id: str) -> bool:
+        """Check if a session exists."""
+        return self._get_entry(session_id) is not None
+
+    async def close(self) -> None:
+        """Release store resources."""
+        self.sessions.clear()
+
+
+class RedisSessionStore:
+    """Redis-backed session store shared by all workers, with idle TTL eviction."""
+
+    def __init__(self, url: str, ttl: int = 3600, max_connections: int = 50,
+                 key_prefix: str = "mcp:sess:"):
+        if redis is None:
+            raise ImportError("redis library not available - install 'redis' to use a Redis session store")
+
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+        self.pool = redis.ConnectionPool.from_url(url, max_connections=max_connections)
+        self.client = redis.Redis(connection_pool=self.pool)
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.key_prefix}{session_id}"
+
+    async def create(self, session_id: str, data: Dict[str, Any]) -> None:
+        """Store a new session record with the configured TTL."""
+        await self.client.set(self._key(session_id), orjson.dumps(data), ex=self.ttl)
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Get a session record and refresh its TTL, or None if it does not exist or has expired."""
+        # GETEX (Redis 6.2+) reads the record and restarts the idle timeout in one round trip
+        raw = await self.client.getex(self._key(session_id), ex=self.ttl)
+        return orjson.loads(raw) if raw is not None else None
+
+    async def update(self, session_id: str, **fields: Any) -> None:
+        """Update fields of an existing session record and refresh its TTL."""
+        key = self._key(session_id)
+
+        async def apply(pipe) -> None:
+            raw = await pipe.get(key)
+            if raw is None:
+                return
+            session = orjson.loads(raw)
+            session.update(fields)
+            pipe.multi()
+            pipe.set(key, orjson.dumps(session), ex=self.ttl)
+
+        # WATCH/MULTI, retried when another update changes the record in between
+        await self.client.transaction(apply, key)
+
+    async def exists(self, session_id: str) -> bool:
+        """Check if a session exists."""
+        return bool(await self.client.exists(self._key(session_id)))
+
+    async def close(self) -> None:
+        """Close the Redis client and its connection pool."""
+        await self.client.aclose()
+        await self.pool.disconnect()
+
+
+def create_session_store(settings):
+    """Create the session store configured in settings."""
+    if settings.redis_url:
+        return RedisSessionStore(
+            settings.redis_url,
+            ttl=settings.session_ttl,
+            max_connections=settings.redis_max_connections
+        )
+    return InMemorySessionStore(
+        ttl=settings.session_ttl,
+        max_sessions=settings.session_max_entries
+    )
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from pydantic_settings import BaseSettings
 from typing import Optional
 
@@ -14,11 +15,22 @@ class Settings(BaseSettings):
     mcp_server_name: str = "fastapi_mcp_template"
     mcp_server_version: str = "1.0.0"
     
+    # Session store settings (in-memory when redis_url is not set)
+    redis_url: Optional[str] = None  # e.g. redis://localhost:6379/0
+    redis_max_connections: int = 50
+    session_ttl: int = 3600  # Seconds before an idle session expires
+    session_max_entries: int = 10000  # In-memory store only: LRU cap on live sessions
+    
     # OpenAI settings for MarkItDown
     openai_api_key: Optional[str] = None
     openai_base_url: Optional[str] = None  # For custom endpoints like Azure OpenAI
     openai_model: str = "gpt-4o"  # Default model for MarkItDown
     markitdown_enable_llm: bool = False  # Enable LLM features for image descriptions
+    ocr_concurrency: int = 8  # Max PDF pages OCR'd / sent to the vision model at once
+    ocr_zoom: float = 1.5  # Render scale for OCR'd PDF pages (1.0 = 72 DPI)
+    ocr_batch_pages: int = 3  # PDF pages sent to the vision model per request
+    conversion_workers: int = 0  # Processes for MarkItDown parsing (0 = threads in the server process, -1 = CPU count)
+    max_file_bytes: int = 50 * 1024 * 1024  # Largest file accepted for conversion
     
     # Logging
     log_level: str = "INFO"
@@ -28,12 +40,7 @@ class Settings(BaseSettings):
         env_file = ".env"
 
 
-_settings = None
-
-
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     """Get application settings (singleton)."""
-    global _settings
-    if _settings is None:
-        _settings = Settings()
-    return _settings
+    return Settings()
@@ -1,8 +1,11 @@
 from typing import Any, Dict, Callable, Optional, Union
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
+# Shared immutable default for unset tag and required lists
+_EMPTY_TUPLE = ()
 
-@dataclass
+
+@dataclass(slots=True)
 class ToolDefinition:
     """Definition structure for a tool."""
     name: str
@@ -11,11 +14,14 @@ class ToolDefinition:
     tool_type: str  # Dynamic string instead of enum
     version: str = "1.0.0"
     author: Optional[str] = None
-    tags: Optional[list] = None
+    tags: Optional[tuple] = None
+    _type_lower: str = field(init=False, repr=False, compare=False)
     
     def __post_init__(self):
         """Register the tool type when creating a definition."""
-        ToolTypeRegistry.register_type(self.tool_type)
+        self.tags = tuple(self.tags) if self.tags else _EMPTY_TUPLE
+        self._type_lower = self.tool_type.lower()
+        ToolTypeRegistry.register_lowered_type(self._type_lower)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary representation."""
@@ -26,7 +32,7 @@ class ToolDefinition:
             "type": self.tool_type,  # Direct string value
             "version": self.version,
             "author": self.author,
-            "tags": self.tags or []
+            "tags": list(self.tags)  # Stored as a tuple, returned as a list
         }
     
     @classmethod
@@ -42,24 +48,36 @@ class ToolDefinition:
         )
 
 
-@dataclass 
+@dataclass(slots=True)
 class ToolSchema:
     """Schema definition for tool parameters."""
     properties: Dict[str, Any]
-    required: list = None
+    required: Optional[tuple] = None
+    
+    def __post_init__(self):
+        """Store required parameter names as a tuple."""
+        self.required = tuple(self.required) if self.required else _EMPTY_TUPLE
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to JSON schema format."""
         return {
             "type": "object",
             "properties": self.properties,
-            "required": self.required or []
+            "required": list(self.required)  # Stored as a tuple, returned as a list
         }
 
 
 class ToolInterface:
     """Interface that tools must implement."""
     
+    # Set to True to receive REST uploads as a binary file object in
+    # ``file_stream`` instead of the full body as bytes in ``file_content``
+    accepts_file_stream: bool = False
+    
+    # Set to True if identical concurrent calls may share one execution and
+    # its result (only for side-effect free tools returning a plain value)
+    coalesce_calls: bool = False
+    
     def get_definition(self) -> ToolDefinition:
         """Get tool definition."""
         raise NotImplementedError
@@ -76,17 +94,27 @@ class ToolInterface:
 class ToolTypeRegistry:
     """Registry for dynamically discovered tool types."""
     
-    _registered_types = set()
+    _registered_types = set()  # Stored lowercased
+    _sorted_cache: Optional[list] = None
     
     @classmethod
     def register_type(cls, tool_type: str) -> None:
         """Register a new tool type."""
-        cls._registered_types.add(tool_type.lower())
+        cls.register_lowered_type(tool_type.lower())
+    
+    @classmethod
+    def register_lowered_type(cls, tool_type: str) -> None:
+        """Register a tool type the caller has already lowercased."""
+        if tool_type not in cls._registered_types:
+            cls._registered_types.add(tool_type)
+            cls._sorted_cache = None
     
     @classmethod
     def get_registered_types(cls) -> list:
         """Get all registered tool types."""
-        return sorted(list(cls._registered_types))
+        if cls._sorted_cache is None:
+            cls._sorted_cache = sorted(cls._registered_types)
+        return list(cls._sorted_cache)
     
     @classmethod
     def is_registered(cls, tool_type: str) -> bool:
@@ -97,6 +125,7 @@ class ToolTypeRegistry:
     def clear(cls) -> None:
         """Clear all registered types (useful for testing)."""
         cls._registered_types.clear()
+        cls._sorted_cache = None
 
 
 # Common tool type constants (optional convenience)
@@ -1,12 +1,19 @@
+import asyncio
 import os
 import importlib.util
 import inspect
-from typing import Dict, List, Callable, Any, Optional
+import sys
+from typing import Dict, List, Callable, Any, Optional, Tuple
 from pathlib import Path
 
+import orjson
+
 from fastapi_mcp_template.core.tool_base import ToolBase
 from fastapi_mcp_template.core.tool_definition import ToolInterface, ToolDefinition
 
+# Methods a tool instance returned by setup_tool must provide (duck typing)
+_REQUIRED_TOOL_METHODS = ('get_definition', 'get_schema', 'execute')
+
 
 class ToolManager:
     """Manages dynamic tool loading and registration."""
@@ -16,6 +23,16 @@ class ToolManager:
         self.registered_tools: Dict[str, Dict[str, Any]] = {}
         self.tool_instances: Dict[str, Any] = {}
         self.tool_base = ToolBase()
+        # MCP tools/list payload, rebuilt only when the registry changes
+        self._mcp_tools_cache: Optional[List[Dict[str, Any]]] = None
+        self._mcp_tools_bytes_cache: Optional[bytes] = None
+        self._tools_listing_bytes_cache: Optional[bytes] = None
+        # Running executions of coalescing tools, keyed by (tool name, arguments)
+        self._inflight: Dict[Tuple[str, frozenset], asyncio.Future] = {}
+        # tool file -> (mtime_ns, size, executed module), reused by reload_tools
+        self._module_cache: Dict[Path, Tuple[int, int, Any]] = {}
+        # (name, mtime_ns, size) of the helper modules the cached tool modules were loaded with
+        self._helpers_signature: Optional[tuple] = None
     
     def set_tool_base(self, tool_base: ToolBase) -> None:
         """Set the tool base instance with injected dependencies."""
@@ -24,80 +41,213 @@ class ToolManager:
     async def discover_tools(self) -> List[ToolDefinition]:
         """Discover all tools in the tools directory."""
         tools = []
+        # ToolBase logging is already a no-op without a logger, so bind it once
+        log_info = self.tool_base.log_info
+        log_error = self.tool_base.log_error
         
         if not self.tools_directory.exists():
-            if self.tool_base.logger:
-                self.tool_base.log_error(f"Tools directory does not exist: {self.tools_directory}")
+            log_error(f"Tools directory does not exist: {self.tools_directory}")
             return tools
         
-        if self.tool_base.logger:
-            self.tool_base.log_info(f"Searching for tools in: {self.tools_directory}")
+        log_info(f"Searching for tools in: {self.tools_directory}")
         
-        for tool_file in self.tools_directory.glob("*.py"):
-            if tool_file.name.startswith("__"):
-                continue
-                
-            if self.tool_base.logger:
-                self.tool_base.log_info(f"Attempting to load tool: {tool_file}")
-                
-            try:
-                tool_definition = await self._load_tool(tool_file)
-                if tool_definition:
-                    tools.append(tool_definition)
-                    if self.tool_base.logger:
-                        self.tool_base.log_info(f"Successfully loaded tool: {tool_definition.name}")
-                else:
-                    if self.tool_base.logger:
-                        self.tool_base.log_error(f"Failed to load tool: {tool_file} (returned None)")
-            except Exception as e:
-                if self.tool_base.logger:
-                    self.tool_base.log_error(f"Failed to load tool {tool_file}: {e}")
+        # Files starting with an underscore, such as _base.py, are helper modules
+        # that tools load themselves, not tools
+        tool_files = []
+        helpers = []
+        with os.scandir(self.tools_directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(".py") and entry.is_file():
+                    if entry.name.startswith("_"):
+                        stat = entry.stat()
+                        helpers.append((entry.name, stat.st_mtime_ns, stat.st_size))
+                    else:
+                        tool_files.append(Path(entry.path))
+        # Cached tool modules hold on to the helpers, so re-execute every tool once
+        # a helper file has changed, dropping helper modules tools registered in
+        # sys.modules so that they are loaded afresh as well
+        helpers_signature = tuple(sorted(helpers))
+        if helpers_signature != self._helpers_signature:
+            self._module_cache.clear()
+            helper_paths = {str(self.tools_directory / name) for name, _, _ in helpers}
+            for module_name, module in list(sys.modules.items()):
+                if getattr(module, "__file__", None) in helper_paths:
+                    del sys.modules[module_name]
+            self._helpers_signature = helpers_signature
+        for tool_file in tool_files:
+            log_info(f"Attempting to load tool: {tool_file}")
+        
+        # Module execution and setup run concurrently in worker threads; the
+        # results are registered serially afterwards
+        results = await asyncio.gather(
+            *(asyncio.to_thread(self._load_tool_sync, tool_file) for tool_file in tool_files),
+            return_exceptions=True
+        )
+        
+        for tool_file, result in zip(tool_files, results):
+            if isinstance(result, BaseException):
+                log_error(f"Failed to load tool {tool_file}: {result}")
+            elif result:
+                tool_definition = self._register_tool(*result)
+                tools.append(tool_definition)
+                log_info(f"Successfully loaded tool: {tool_definition.name}")
+            else:
+                log_error(f"Failed to load tool: {tool_file} (returned None)")
         
         return tools
     
-    async def _load_tool(self, tool_file: Path) -> Optional[ToolDefinition]:
-        """Load a single tool from file."""
-        module_name = tool_file.stem
-        spec = importlib.util.spec_from_file_location(module_name, tool_file)
-        
-        if not spec or not spec.loader:
+    def _load_tool_sync(self, tool_file: Path) -> Optional[Tuple[ToolDefinition, Any, Any, Callable]]:
+        """Execute a tool file and set up its tool, without registering it."""
+        module = self._load_module(tool_file)
+        if module is None:
             return None
         
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)        
         # Look for the setup function
         setup_function = getattr(module, 'setup_tool', None)
         if not setup_function or not callable(setup_function):
             return None
         
+        # Modules that can describe their tool up front are set up on first use
+        definition_hint = getattr(module, 'get_definition_hint', None)
+        if callable(definition_hint):
+            return definition_hint(), None, module, setup_function
+        
+        tool_instance = self._setup_tool(setup_function)
+        if tool_instance is None:
+            return None
+        
+        return tool_instance.get_definition(), tool_instance, module, setup_function
+    
+    def _setup_tool(self, setup_function: Callable) -> Any:
+        """Call a tool's setup function, returning None if the result is not a tool."""
         # Call setup function with tool_base
         tool_instance = setup_function(self.tool_base)
         
         # Check if tool_instance has required methods (duck typing)
-        if not all(hasattr(tool_instance, method) for method in ['get_definition', 'get_schema', 'execute']):
+        methods = [getattr(tool_instance, name, None) for name in _REQUIRED_TOOL_METHODS]
+        if not all(callable(method) for method in methods):
             return None
         
-        definition = tool_instance.get_definition()
+        return tool_instance
+    
+    def _load_module(self, tool_file: Path) -> Any:
+        """Execute a tool file, reusing the cached module if the file is unchanged."""
+        stat = tool_file.stat()
+        cached = self._module_cache.get(tool_file)
+        if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        
+        module_name = tool_file.stem
+        spec = importlib.util.spec_from_file_location(module_name, tool_file)
+        
+        if not spec or not spec.loader:
+            return None
         
-        # Register the tool
-        self.registered_tools[definition.name] = {
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        self._module_cache[tool_file] = (stat.st_mtime_ns, stat.st_size, module)
+        return module
+    
+    def clear_cache(self) -> None:
+        """Forget cached tool modules so the next load re-executes every file."""
+        self._module_cache.clear()
+    
+    def _register_tool(self, definition: ToolDefinition, tool_instance: Any, module: Any,
+                       setup_function: Callable) -> ToolDefinition:
+        """Register a loaded tool (tool_instance is None for lazily set up tools)."""
+        tool_info = {
             "definition": definition,
-            "instance": tool_instance,
-            "module": module
+            "instance": None,
+            "module": module,
+            "setup": setup_function
         }
+        if tool_instance is not None:
+            self._bind_instance(tool_info, tool_instance)
+        
+        self.registered_tools[definition.name] = tool_info
+        self._invalidate_tool_cache()
         
         return definition
     
-    async def execute_tool(self, tool_name: str, **kwargs) -> Dict[str, Any]:
-        """Execute a registered tool."""
+    def _bind_instance(self, tool_info: Dict[str, Any], tool_instance: Any) -> None:
+        """Attach a set up tool instance and its derived entries to a registry entry."""
+        definition = tool_info["definition"]
+        schema = tool_instance.get_schema()
+        schema_dict = schema if isinstance(schema, dict) else schema.to_dict()
+        listing = {**definition.to_dict(), "schema": schema_dict}
+        # Schemas are static, so the schema dict and listing entries are built once here
+        tool_info.update({
+            "instance": tool_instance,
+            "execute": tool_instance.execute,  # Bound once instead of per call
+            "schema_dict": schema_dict,
+            "mcp_definition": {
+                "name": definition.name,
+                "description": definition.description,
+                "inputSchema": schema_dict
+            },
+            "listing": listing,
+            "listing_bytes": orjson.dumps(listing),
+            "coalesce": bool(getattr(tool_instance, "coalesce_calls", False))
+        })
+    
+    def _get_tool_info(self, tool_name: str) -> Dict[str, Any]:
+        """Get a tool's registry entry, setting the tool up on first use."""
         if tool_name not in self.registered_tools:
             raise ValueError(f"Tool '{tool_name}' not found")
         
         tool_info = self.registered_tools[tool_name]
-        tool_instance = tool_info["instance"]
+        if tool_info["instance"] is None:
+            tool_instance = self._setup_tool(tool_info["setup"])
+            if tool_instance is None:
+                raise TypeError(f"setup_tool for '{tool_name}' did not return a valid tool")
+            self._bind_instance(tool_info, tool_instance)
+        
+        return tool_info
+    
+    def _set_up_tools(self) -> List[Dict[str, Any]]:
+        """Get the registry entries of all tools, skipping lazy tools that fail to set up."""
+        tool_infos = []
+        for tool_name in list(self.registered_tools):
+            try:
+                tool_infos.append(self._get_tool_info(tool_name))
+            except Exception as e:
+                self.tool_base.log_error(f"Failed to set up tool {tool_name}: {e}")
+        return tool_infos
+    
+    async def execute_tool(self, tool_name: str, **kwargs) -> Dict[str, Any]:
+        """Execute a registered tool."""
+        tool_info = self._get_tool_info(tool_name)
+        execute = tool_info["execute"]
+        
+        if not tool_info["coalesce"]:
+            return await self._run_tool(tool_name, execute, kwargs)
         
         try:
-            result = await tool_instance.execute(**kwargs)
+            # Value types are part of the key, as 1, 1.0 and True compare equal
+            key = (tool_name, frozenset((name, type(value), value) for name, value in kwargs.items()))
+        except TypeError:
+            # Unhashable arguments (lists, dicts) cannot be matched; run directly
+            return await self._run_tool(tool_name, execute, kwargs)
+        
+        # Identical concurrent calls share one execution
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run_tool(tool_name, execute, kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so a cancelled caller does not cancel the call for the others
+        result = await asyncio.shield(task)
+        # Each caller gets its own copy, so one changing it does not affect the others
+        return dict(result) if isinstance(result, dict) else result
+    
+    async def _run_tool(self, tool_name: str, execute: Callable, kwargs: Dict[str, Any]) -> Any:
+        """Run a tool's execute method and record metrics."""
+        try:
+            # Streaming tools implement execute as an async generator; hand the
+            # generator back to the caller instead of awaiting it
+            result = execute(**kwargs)
+            if inspect.isawaitable(result):
+                result = await result
             
             # Record metrics
             self.tool_base.record_metric(f"tool.{tool_name}.execution", 1)
@@ -110,13 +260,13 @@ class ToolManager:
     
     def get_tool_schema(self, tool_name: str) -> Dict[str, Any]:
         """Get schema for a tool."""
+        return self._get_tool_info(tool_name)["schema_dict"]
+    
+    def tool_accepts_file_stream(self, tool_name: str) -> bool:
+        """Check if a tool takes uploads as a file object instead of bytes."""
         if tool_name not in self.registered_tools:
-            raise ValueError(f"Tool '{tool_name}' not found")
-        
-        tool_info = self.registered_tools[tool_name]
-        tool_instance = tool_info["instance"]
-        
-        return tool_instance.get_schema().to_dict()
+            return False
+        return bool(getattr(self._get_tool_info(tool_name)["instance"], "accepts_file_stream", False))
     
     def get_tool_definition(self, tool_name: str) -> ToolDefinition:
         """Get definition for a tool."""
@@ -127,19 +277,59 @@ class ToolManager:
     
     def list_tools(self) -> List[Dict[str, Any]]:
         """List all registered tools."""
-        return [
-            {
-                **tool_info["definition"].to_dict(),
-                "schema": tool_info["instance"].get_schema().to_dict()
-            }
-            for tool_info in self.registered_tools.values()
-        ]
+        return [tool_info["listing"] for tool_info in self._set_up_tools()]
+    
+    def list_tools_raw(self) -> bytes:
+        """List all registered tools as a pre-serialized JSON array (cached)."""
+        if self._tools_listing_bytes_cache is None:
+            self._tools_listing_bytes_cache = (
+                b'[' + b','.join(tool_info["listing_bytes"] for tool_info in self._set_up_tools()) + b']'
+            )
+        
+        return self._tools_listing_bytes_cache
+    
+    def get_mcp_tool_definitions(self) -> List[Dict[str, Any]]:
+        """Get tool definitions in MCP tools/list format (cached)."""
+        if self._mcp_tools_cache is None:
+            self._mcp_tools_cache = [
+                tool_info["mcp_definition"] for tool_info in self._set_up_tools()
+            ]
+        
+        return self._mcp_tools_cache
+    
+    def get_mcp_tool_definitions_bytes(self) -> bytes:
+        """Get the MCP tools/list definitions pre-serialized as JSON (cached)."""
+        if self._mcp_tools_bytes_cache is None:
+            self._mcp_tools_bytes_cache = orjson.dumps(self.get_mcp_tool_definitions())
+        
+        return self._mcp_tools_bytes_cache
+    
+    def _invalidate_tool_cache(self) -> None:
+        """Drop cached tool listings after the registry changed."""
+        self._mcp_tools_cache = None
+        self._mcp_tools_bytes_cache = None
+        self._tools_listing_bytes_cache = None
     
     def get_available_tools(self) -> List[ToolDefinition]:
         """Get all available tool definitions."""
         return [tool_info["definition"] for tool_info in self.registered_tools.values()]
     
+    async def close_tools(self) -> None:
+        """Release the resources of set up tools that provide a close() method."""
+        for tool_name, tool_info in self.registered_tools.items():
+            close = getattr(tool_info["instance"], "close", None)
+            if close is None:
+                continue
+            try:
+                result = close()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                self.tool_base.log_error(f"Failed to close tool {tool_name}: {e}")
+    
     async def reload_tools(self) -> List[ToolDefinition]:
         """Reload all tools (for development)."""
+        await self.close_tools()
         self.registered_tools.clear()
+        self._invalidate_tool_cache()
         return await self.discover_tools()
@@ -5,9 +5,74 @@ import asyncio
 import logging
 import importlib.util
 import sys
+from functools import lru_cache
 from typing import Any, Dict, Optional
 from pathlib import Path
 
+# Package layout, resolved once for all test helpers
+PACKAGE_DIR = Path(__file__).resolve().parent.parent
+CORE_DIR = PACKAGE_DIR / "core"
+API_DIR = PACKAGE_DIR / "api"
+TOOLS_DIR = PACKAGE_DIR.parent / "tools"
+CONFIG_PATH = PACKAGE_DIR / "config.py"
+TOOL_BASE_PATH = CORE_DIR / "tool_base.py"
+
+
+def load_package_module(module_name: str, file_path: Path):
+    """Import a package module (cached in sys.modules), falling back to its file."""
+    try:
+        return importlib.import_module(f"fastapi_mcp_template.{module_name}")
+    except ImportError:
+        # Package not importable (e.g. not on sys.path); exec_module raises if the file is missing
+        spec = importlib.util.spec_from_file_location(file_path.stem, file_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+
+@lru_cache(maxsize=1)
+def get_cached_config() -> Dict[str, Any]:
+    """Load configuration once per process."""
+    try:
+        try:
+            from fastapi_mcp_template.config import get_settings
+        except ImportError:
+            # Package not importable; load config.py from its file instead
+            get_settings = load_package_module("config", CONFIG_PATH).get_settings
+        
+        return get_settings().model_dump()
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Could not load config: {e}")
+        return {}
+    
+    # Fallback to basic config
+    return {
+        "host": "0.0.0.0",
+        "port": 8000,
+        "debug": True,
+        "tools_directory": "/app/tools"
+    }
+
+
+@lru_cache(maxsize=1)
+def get_cached_tool_base_cls():
+    """Load the ToolBase class once per process."""
+    try:
+        try:
+            from fastapi_mcp_template.core.tool_base import ToolBase
+        except ImportError:
+            # Package not importable; load tool_base.py from its file instead
+            ToolBase = load_package_module("core.tool_base", TOOL_BASE_PATH).ToolBase
+        
+        return ToolBase
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Could not load ToolBase: {e}")
+        return None
+
 
 class TestBase:
     """Base class for all tests with common utilities."""
@@ -21,45 +86,13 @@ class TestBase:
             self.tool_base.set_config(self.config)
     
     def _load_config(self) -> Dict[str, Any]:
-        """Dynamically load configuration."""
-        try:
-            # Try to import config module
-            config_path = Path(__file__).parent.parent / "config.py"
-            if config_path.exists():
-                spec = importlib.util.spec_from_file_location("config", config_path)
-                config_module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(config_module)
-                
-                if hasattr(config_module, 'get_settings'):
-                    return config_module.get_settings().dict()
-              # Fallback to basic config
-            return {
-                "host": "0.0.0.0",
-                "port": 8000,
-                "debug": True,
-                "tools_directory": "/app/tools"
-            }
-        except Exception as e:
-            self.logger.warning(f"Could not load config: {e}")
-            return {}
+        """Get configuration (loaded once per process)."""
+        return dict(get_cached_config())
     
     def _load_tool_base(self):
-        """Dynamically load ToolBase."""
-        try:
-            # Try to import ToolBase
-            tool_base_path = Path(__file__).parent.parent / "core" / "tool_base.py"
-            if tool_base_path.exists():
-                spec = importlib.util.spec_from_file_location("tool_base", tool_base_path)
-                tool_base_module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(tool_base_module)
-                
-                if hasattr(tool_base_module, 'ToolBase'):
-                    return tool_base_module.ToolBase()
-            
-            return None
-        except Exception as e:
-            self.logger.warning(f"Could not load ToolBase: {e}")
-            return None
+        """Create a ToolBase instance (module loaded once per process)."""
+        tool_base_cls = get_cached_tool_base_cls()
+        return tool_base_cls() if tool_base_cls else None
     
     def setup_test_environment(self) -> None:
         """Setup test environment."""
@@ -68,20 +101,18 @@ class TestBase:
         # Setup logging for tests
         logging.basicConfig(level=logging.DEBUG)
         
-        # Setup test directories in a temporary location with proper permissions
-        temp_dir = tempfile.mkdtemp(prefix="mcp_test_")
-        self.test_data_dir = Path(temp_dir) / "test_data"
-        self.test_data_dir.mkdir(exist_ok=True)
-        
-        # Clear any existing test files
+        # Start from a fresh temporary directory (removed as a whole on cleanup)
         self.cleanup_test_files()
+        self._temp_dir = tempfile.TemporaryDirectory(prefix="mcp_test_")
+        self.test_data_dir = Path(self._temp_dir.name) / "test_data"
+        self.test_data_dir.mkdir()
     
     def cleanup_test_files(self) -> None:
         """Clean up test files."""
-        if self.test_data_dir.exists():
-            for file in self.test_data_dir.glob("*"):
-                if file.is_file():
-                    file.unlink()
+        temp_dir = getattr(self, "_temp_dir", None)
+        if temp_dir is not None:
+            temp_dir.cleanup()
+            self._temp_dir = None
     
     def create_test_file(self, filename: str, content: str) -> Path:
         """Create a test file with given content."""
@@ -99,19 +130,28 @@ class TestBase:
 
 
 class AsyncTestCase(unittest.TestCase):
-    """Base async test case."""
+    """Base async test case (one event loop is shared by all tests of a class)."""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Set up the event loop for the test class."""
+        cls.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(cls.loop)
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Close the event loop of the test class."""
+        cls.loop.close()
+        asyncio.set_event_loop(None)
     
     def setUp(self):
         """Set up test case."""
         self.test_base = TestBase()
         self.test_base.setup_test_environment()
-        self.loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(self.loop)
     
     def tearDown(self):
         """Tear down test case."""
         self.test_base.cleanup_test_files()
-        self.loop.close()
     
     def run_async(self, coro):
         """Run async coroutine in test."""
@@ -125,38 +165,39 @@ class ToolTestBase(TestBase):
         super().__init__()
         self.test_tools: Dict[str, Any] = {}
     
-    async def load_test_tool(self, tool_name: str) -> Any:
+    def load_test_tool(self, tool_name: str) -> Any:
         """Load a specific tool for testing."""
         try:
             # Import the tool module
-            module_path = Path(__file__).parent.parent.parent / "tools" / f"{tool_name}.py"
-            
-            if not module_path.exists():
-                raise FileNotFoundError(f"Tool {tool_name} not found at {module_path}")
+            module_path = TOOLS_DIR / f"{tool_name}.py"
             
-            # Dynamic import
-            import importlib.util
+            # Dynamic import (exec_module raises if the file is missing)
             spec = importlib.util.spec_from_file_location(tool_name, module_path)
             module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
+            try:
+                spec.loader.exec_module(module)
+            except FileNotFoundError:
+                raise FileNotFoundError(f"Tool {tool_name} not found at {module_path}") from None
             
-            # Find the tool class
-            for name, obj in inspect.getmembers(module):
-                # Look for classes that implement ToolInterface (have get_definition, get_schema, execute methods)
-                if (inspect.isclass(obj) and 
-                    hasattr(obj, 'get_definition') and 
-                    hasattr(obj, 'get_schema') and 
-                    hasattr(obj, 'execute') and
-                    name != 'ToolInterface'):  # Exclude the interface itself
-                    
-                    # Create tool instance with tool_base parameter
-                    tool_instance = obj(self)
-                    
-                    self.test_tools[tool_name] = tool_instance
-                    self.log_test_info(f"Loaded test tool: {tool_name}")
-                    return tool_instance
+            # Find the tool class: an explicit TOOL_CLASS, or the first class defined in the
+            # module (not imported) that implements ToolInterface, excluding the interface itself
+            tool_class = getattr(module, 'TOOL_CLASS', None) or next(
+                (obj for name, obj in vars(module).items()
+                 if inspect.isclass(obj) and
+                 obj.__module__ == module.__name__ and
+                 name != 'ToolInterface' and
+                 all(hasattr(obj, method) for method in ('get_definition', 'get_schema', 'execute'))),
+                None
+            )
+            if tool_class is None:
+                raise ValueError(f"No valid tool class found in {tool_name}")
             
-            raise ValueError(f"No valid tool class found in {tool_name}")
+            # Create tool instance with tool_base parameter
+            tool_instance = tool_class(self)
+            
+            self.test_tools[tool_name] = tool_instance
+            self.log_test_info(f"Loaded test tool: {tool_name}")
+            return tool_instance
             
         except Exception as e:
             self.log_test_error(f"Failed to load tool {tool_name}: {e}")
@@ -165,7 +206,7 @@ class ToolTestBase(TestBase):
     async def execute_tool_test(self, tool_name: str, parameters: Dict[str, Any]) -> Any:
         """Execute a tool with test parameters."""
         if tool_name not in self.test_tools:
-            await self.load_test_tool(tool_name)
+            self.load_test_tool(tool_name)
         
         tool = self.test_tools[tool_name]
         self.log_test_info(f"Executing tool {tool_name} with parameters: {parameters}")
@@ -193,6 +234,9 @@ class ToolTestBase(TestBase):
     def log_info(self, message: str) -> None:
         """Log info message - required by tool interface."""
         self.logger.info(f"[TOOL INFO] {message}")
+    
+    def record_metric(self, name: str, value: Any) -> None:
+        """Record metric - required by tool interface (not collected in tests)."""
 
 
 import inspect
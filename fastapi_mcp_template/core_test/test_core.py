@@ -2,11 +2,14 @@
 
 import unittest
 import asyncio
-import importlib.util
 import sys
+import time
+import types
 from pathlib import Path
+from typing import Dict, List
+from unittest import mock
 
-from .test_base import AsyncTestCase, TestBase
+from .test_base import AsyncTestCase, TestBase, API_DIR, CONFIG_PATH, CORE_DIR, TOOLS_DIR, load_package_module
 
 
 class TestCore(AsyncTestCase):
@@ -31,6 +34,17 @@ class TestCore(AsyncTestCase):
         self.assertTrue(file_path.exists())
         self.assertEqual(file_path.read_text(), content)
     
+    def test_definition_dicts_use_lists(self):
+        """Test that tags and required are returned as lists."""
+        tool_definition = load_package_module("core.tool_definition", CORE_DIR / "tool_definition.py")
+        definition = tool_definition.ToolDefinition("t", "Test", "/t", "utility", tags=["a"])
+        schema = tool_definition.ToolSchema(properties={}, required=["x"])
+        
+        self.assertEqual(definition.to_dict()["tags"], ["a"])
+        self.assertEqual(schema.to_dict()["required"], ["x"])
+        schema.to_dict()["required"].append("y")
+        self.assertEqual(schema.to_dict()["required"], ["x"])
+    
     async def test_async_functionality(self):
         """Test async functionality works."""
         await asyncio.sleep(0.01)  # Simple async operation
@@ -52,10 +66,7 @@ class TestToolManager(AsyncTestCase):
     def _load_tool_manager(self):
         """Dynamically load tool manager."""
         try:
-            tool_manager_path = Path(__file__).parent.parent / "core" / "tool_manager.py"
-            spec = importlib.util.spec_from_file_location("tool_manager", tool_manager_path)
-            tool_manager_module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(tool_manager_module)
+            tool_manager_module = load_package_module("core.tool_manager", CORE_DIR / "tool_manager.py")
             return tool_manager_module.ToolManager
         except Exception as e:
             self.fail(f"Could not load ToolManager: {e}")
@@ -83,6 +94,231 @@ class TestToolManager(AsyncTestCase):
         self.assertIsNotNone(tool_manager.tools_directory)
         self.assertIsInstance(tool_manager.registered_tools, dict)
 
+    def test_mcp_tool_definitions_cache(self):
+        """Test that the tool list payloads are cached until tools are reloaded."""
+        import orjson
+        ToolManager = self._load_tool_manager()
+
+        tool_manager = ToolManager(tools_directory=str(TOOLS_DIR))
+        tool_manager.set_tool_base(self.test_base.tool_base)
+        self.run_async(tool_manager.discover_tools())
+
+        definitions = tool_manager.get_mcp_tool_definitions()
+        self.assertIs(definitions, tool_manager.get_mcp_tool_definitions())
+        self.assertEqual(orjson.loads(tool_manager.get_mcp_tool_definitions_bytes()), definitions)
+        self.assertEqual(len(definitions), len(tool_manager.registered_tools))
+        self.assertEqual(orjson.loads(tool_manager.list_tools_raw()),
+                         orjson.loads(orjson.dumps(tool_manager.list_tools())))
+
+        self.run_async(tool_manager.reload_tools())
+        self.assertIsNot(definitions, tool_manager.get_mcp_tool_definitions())
+
+    def test_reload_reuses_unchanged_modules(self):
+        """Test that reloading skips re-executing unchanged tool files."""
+        ToolManager = self._load_tool_manager()
+
+        tool_manager = ToolManager(tools_directory=str(TOOLS_DIR))
+        tool_manager.set_tool_base(self.test_base.tool_base)
+        self.run_async(tool_manager.discover_tools())
+        modules = {name: info["module"] for name, info in tool_manager.registered_tools.items()}
+
+        self.run_async(tool_manager.reload_tools())
+        for name, info in tool_manager.registered_tools.items():
+            self.assertIs(info["module"], modules[name])
+
+        tool_manager.clear_cache()
+        self.run_async(tool_manager.reload_tools())
+        for name, info in tool_manager.registered_tools.items():
+            self.assertIsNot(info["module"], modules[name])
+
+    def test_tools_share_base_classes(self):
+        """Test that every tool loading _base.py gets the same shared classes."""
+        ToolManager = self._load_tool_manager()
+
+        tool_manager = ToolManager(tools_directory=str(TOOLS_DIR))
+        tool_manager.set_tool_base(self.test_base.tool_base)
+        self.run_async(tool_manager.discover_tools())
+        interfaces = [info["module"].ToolInterface for info in tool_manager.registered_tools.values()
+                      if hasattr(info["module"], "ToolInterface")]
+        self.assertGreaterEqual(len(interfaces), 2)
+        self.assertTrue(all(interface is interfaces[0] for interface in interfaces))
+
+    def test_helper_changes_reload_tools(self):
+        """Test that editing an underscore helper module re-executes cached tools."""
+        ToolManager = self._load_tool_manager()
+        
+        tools_dir = self.test_base.test_data_dir / "helper_tools"
+        tools_dir.mkdir()
+        helper = tools_dir / "_helper.py"
+        helper.write_text("NAME = 'first'\n")
+        (tools_dir / "helper_tool.py").write_text(
+            "import importlib.util\n"
+            "from pathlib import Path\n"
+            "from fastapi_mcp_template.core.tool_definition import ToolDefinition, ToolSchema\n"
+            "_spec = importlib.util.spec_from_file_location('helper', Path(__file__).with_name('_helper.py'))\n"
+            "_helper = importlib.util.module_from_spec(_spec)\n"
+            "_spec.loader.exec_module(_helper)\n"
+            "class HelperTool:\n"
+            "    def get_definition(self):\n"
+            "        return ToolDefinition(_helper.NAME, 'Helper tool', '/helper', 'utility')\n"
+            "    def get_schema(self):\n"
+            "        return ToolSchema(properties={})\n"
+            "    async def execute(self, **kwargs):\n"
+            "        return _helper.NAME\n"
+            "def setup_tool(tool_base):\n"
+            "    return HelperTool()\n"
+        )
+        
+        tool_manager = ToolManager(tools_directory=str(tools_dir))
+        tool_manager.set_tool_base(self.test_base.tool_base)
+        tools = self.run_async(tool_manager.discover_tools())
+        self.assertEqual([tool.name for tool in tools], ["first"])
+        
+        helper.write_text("NAME = 'second'\n")
+        tools = self.run_async(tool_manager.reload_tools())
+        self.assertEqual([tool.name for tool in tools], ["second"])
+    
+    def test_identical_calls_are_coalesced(self):
+        """Test that concurrent identical calls to a coalescing tool run once."""
+        ToolManager = self._load_tool_manager()
+
+        class CountingTool:
+            coalesce_calls = True
+            calls = 0
+
+            async def execute(self, **kwargs):
+                CountingTool.calls += 1
+                await asyncio.sleep(0.01)
+                return {"echo": kwargs}
+
+        tool_manager = ToolManager()
+        tool_manager.set_tool_base(self.test_base.tool_base)
+        tool_instance = CountingTool()
+        tool_manager.registered_tools["counter"] = {
+            "instance": tool_instance,
+            "execute": tool_instance.execute,
+            "coalesce": True
+        }
+
+        async def run_calls():
+            return await asyncio.gather(
+                tool_manager.execute_tool("counter", text="a"),
+                tool_manager.execute_tool("counter", text="a"),
+                tool_manager.execute_tool("counter", text="b"),
+                tool_manager.execute_tool("counter", items=["a"]),
+                tool_manager.execute_tool("counter", count=1),
+                tool_manager.execute_tool("counter", count=True)
+            )
+
+        results = self.run_async(run_calls())
+        self.assertEqual(CountingTool.calls, 5)
+        self.assertEqual(results[0], results[1])
+        self.assertIsNot(results[0], results[1])
+        self.assertEqual(results[3], {"echo": {"items": ["a"]}})
+        self.assertIs(results[5]["echo"]["count"], True)
+        self.assertEqual(tool_manager._inflight, {})
+
+    def test_close_tools(self):
+        """Test that set up tools with a close() method are closed."""
+        ToolManager = self._load_tool_manager()
+
+        class ClosingTool:
+            closed = False
+
+            async def close(self):
+                self.closed = True
+
+        tool_manager = ToolManager()
+        tool_manager.set_tool_base(self.test_base.tool_base)
+        tool_instance = ClosingTool()
+        tool_manager.registered_tools["closing"] = {"instance": tool_instance}
+        tool_manager.registered_tools["lazy"] = {"instance": None}
+
+        self.run_async(tool_manager.close_tools())
+        self.assertTrue(tool_instance.closed)
+
+    def test_tools_with_definition_hint_are_set_up_lazily(self):
+        """Test that tools exposing get_definition_hint are set up on first use."""
+        ToolManager = self._load_tool_manager()
+        
+        tools_dir = self.test_base.test_data_dir / "lazy_tools"
+        tools_dir.mkdir()
+        (tools_dir / "lazy_tool.py").write_text(
+            "from fastapi_mcp_template.core.tool_definition import ToolDefinition, ToolSchema\n"
+            "setup_calls = []\n"
+            "def get_definition_hint():\n"
+            "    return ToolDefinition('lazy_tool', 'Lazy tool', '/lazy', 'utility')\n"
+            "class LazyTool:\n"
+            "    def get_definition(self):\n"
+            "        return get_definition_hint()\n"
+            "    def get_schema(self):\n"
+            "        return ToolSchema(properties={})\n"
+            "    async def execute(self, **kwargs):\n"
+            "        return 'done'\n"
+            "def setup_tool(tool_base):\n"
+            "    setup_calls.append(tool_base)\n"
+            "    return LazyTool()\n"
+        )
+        
+        tool_manager = ToolManager(tools_directory=str(tools_dir))
+        tool_manager.set_tool_base(self.test_base.tool_base)
+        tools = self.run_async(tool_manager.discover_tools())
+        module = tool_manager.registered_tools["lazy_tool"]["module"]
+        
+        self.assertEqual([tool.name for tool in tools], ["lazy_tool"])
+        self.assertEqual(module.setup_calls, [])
+        
+        self.assertEqual(self.run_async(tool_manager.execute_tool("lazy_tool")), "done")
+        self.assertEqual(self.run_async(tool_manager.execute_tool("lazy_tool")), "done")
+        self.assertEqual(len(module.setup_calls), 1)
+
+
+class TestTestManager(unittest.TestCase):
+    """Test test manager functionality."""
+    
+    def _run_class(self, cls):
+        """Run all test methods of a class through the test manager."""
+        test_manager_module = load_package_module("core_test.test_manager", Path(__file__).parent / "test_manager.py")
+        test_manager = test_manager_module.TestManager(max_concurrency=1)
+        try:
+            methods = list(test_manager_module._test_methods(cls))
+            test_class_info = {
+                'class': cls,
+                'async_methods': frozenset(),
+                **test_manager_module._fixture_flags(cls)
+            }
+            return test_manager._run_test_class(test_class_info, methods)
+        finally:
+            test_manager.close()
+    
+    def test_methods_get_fresh_instances_by_default(self):
+        """Test that every method runs on its own set up instance unless sharing is enabled."""
+        class Isolated:
+            setups = 0
+            
+            def setUp(self):
+                type(self).setups += 1
+                self.items = []
+            
+            def test_a(self):
+                self.items.append("a")
+                assert self.items == ["a"]
+            
+            def test_b(self):
+                self.items.append("b")
+                assert self.items == ["b"]
+        
+        class Shared(Isolated):
+            _share_instance = True
+            setups = 0
+        
+        self.assertTrue(all(result.success for result in self._run_class(Isolated)))
+        self.assertEqual(Isolated.setups, 2)
+        
+        results = self._run_class(Shared)
+        self.assertEqual(Shared.setups, 1)
+        self.assertEqual([result.success for result in results], [True, False])
+
 
 class TestConfig(unittest.TestCase):
     """Test configuration functionality."""
@@ -90,11 +326,7 @@ class TestConfig(unittest.TestCase):
     def _load_config(self):
         """Dynamically load config."""
         try:
-            config_path = Path(__file__).parent.parent / "config.py"
-            spec = importlib.util.spec_from_file_location("config", config_path)
-            config_module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(config_module)
-            return config_module
+            return load_package_module("config", CONFIG_PATH)
         except Exception as e:
             self.fail(f"Could not load config: {e}")
     
@@ -116,11 +348,7 @@ class TestApiRoutes(AsyncTestCase):
     def _load_routes(self):
         """Dynamically load routes module."""
         try:
-            routes_path = Path(__file__).parent.parent / "api" / "routes.py"
-            spec = importlib.util.spec_from_file_location("routes", routes_path)
-            routes_module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(routes_module)
-            return routes_module
+            return load_package_module("api.routes", API_DIR / "routes.py")
         except Exception as e:
             self.fail(f"Could not load routes: {e}")
     
@@ -132,6 +360,172 @@ class TestApiRoutes(AsyncTestCase):
         self.assertTrue(hasattr(routes_module, 'create_dynamic_routes'))
 
 
+class _FakeRedis:
+    """In-memory stand-in for redis.asyncio.Redis, covering what RedisSessionStore uses."""
+    
+    def __init__(self, connection_pool=None):
+        self.connection_pool = connection_pool
+        self.values: Dict[str, bytes] = {}
+        self.ttls: Dict[str, int] = {}
+        self.versions: Dict[str, int] = {}
+        self.closed = False
+        # Called after a transaction's reads, to simulate a concurrent writer
+        self.before_commit = None
+    
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+        self.ttls[key] = ex
+        self.versions[key] = self.versions.get(key, 0) + 1
+    
+    async def getex(self, key, ex=None):
+        if key in self.values:
+            self.ttls[key] = ex
+        return self.values.get(key)
+    
+    async def get(self, key):
+        return self.values.get(key)
+    
+    async def exists(self, key):
+        return int(key in self.values)
+    
+    async def transaction(self, func, *watches):
+        # WATCH/MULTI/EXEC: retry while a watched key changed before the commit
+        while True:
+            seen = {key: self.versions.get(key) for key in watches}
+            pipe = _FakePipeline(self)
+            await func(pipe)
+            if self.before_commit is not None:
+                before_commit, self.before_commit = self.before_commit, None
+                await before_commit()
+            if all(self.versions.get(key) == version for key, version in seen.items()):
+                for command, args, kwargs in pipe.queued:
+                    await getattr(self, command)(*args, **kwargs)
+                return
+    
+    async def aclose(self):
+        self.closed = True
+
+
+class _FakePipeline:
+    """Pipeline of _FakeRedis: immediate reads until multi(), then queued commands."""
+    
+    def __init__(self, client: _FakeRedis):
+        self.client = client
+        self.queued: List[tuple] = []
+    
+    async def get(self, key):
+        return await self.client.get(key)
+    
+    def multi(self):
+        pass
+    
+    def set(self, key, value, ex=None):
+        self.queued.append(("set", (key, value), {"ex": ex}))
+
+
+class _FakeRedisPool:
+    """Stand-in for redis.asyncio.ConnectionPool."""
+    
+    def __init__(self):
+        self.disconnected = False
+    
+    @classmethod
+    def from_url(cls, url, max_connections=None):
+        return cls()
+    
+    async def disconnect(self):
+        self.disconnected = True
+
+
+class TestSessionStore(AsyncTestCase):
+    """Test in-memory and Redis session store functionality."""
+    
+    def _load_sessions(self):
+        """Dynamically load sessions module."""
+        try:
+            return load_package_module("api.sessions", API_DIR / "sessions.py")
+        except Exception as e:
+            self.fail(f"Could not load sessions: {e}")
+    
+    def test_session_lifecycle(self):
+        """Test session creation, update and lookup."""
+        store = self._load_sessions().InMemorySessionStore()
+        
+        self.run_async(store.create("abc", {"initialized": False}))
+        self.run_async(store.update("abc", initialized=True))
+        
+        self.assertTrue(self.run_async(store.exists("abc")))
+        self.assertEqual(self.run_async(store.get("abc")), {"initialized": True})
+        self.assertIsNone(self.run_async(store.get("missing")))
+    
+    def test_session_expiry_and_eviction(self):
+        """Test that sessions expire after the TTL and are capped in number."""
+        InMemorySessionStore = self._load_sessions().InMemorySessionStore
+        
+        expired_store = InMemorySessionStore(ttl=0)
+        self.run_async(expired_store.create("abc", {}))
+        self.assertFalse(self.run_async(expired_store.exists("abc")))
+        
+        store = InMemorySessionStore(max_sessions=2)
+        for session_id in ("a", "b"):
+            self.run_async(store.create(session_id, {}))
+        self.run_async(store.get("a"))  # "b" is now least recently used
+        self.run_async(store.create("c", {}))
+        
+        self.assertEqual(list(store.sessions), ["a", "c"])
+    
+    def test_session_access_refreshes_ttl(self):
+        """Test that looking up a session restarts its idle timeout."""
+        store = self._load_sessions().InMemorySessionStore(ttl=60)
+        self.run_async(store.create("abc", {}))
+        store.sessions["abc"] = (time.monotonic() + 1, {})
+        
+        self.assertEqual(self.run_async(store.get("abc")), {})
+        self.assertGreater(store.sessions["abc"][0], time.monotonic() + 30)
+    
+    def _redis_store(self, ttl: int = 60):
+        """Create a RedisSessionStore backed by _FakeRedis."""
+        sessions = self._load_sessions()
+        fake_redis = types.SimpleNamespace(ConnectionPool=_FakeRedisPool, Redis=_FakeRedis)
+        with mock.patch.object(sessions, "redis", fake_redis):
+            return sessions.RedisSessionStore("redis://localhost:6379/0", ttl=ttl)
+    
+    def test_redis_session_access_refreshes_ttl(self):
+        """Test that looking up a Redis session restarts its TTL in the same GETEX call."""
+        store = self._redis_store(ttl=60)
+        self.run_async(store.create("abc", {"initialized": False}))
+        store.client.ttls["mcp:sess:abc"] = 1
+        
+        self.assertEqual(self.run_async(store.get("abc")), {"initialized": False})
+        self.assertEqual(store.client.ttls["mcp:sess:abc"], 60)
+        self.assertIsNone(self.run_async(store.get("missing")))
+        self.assertNotIn("mcp:sess:missing", store.client.ttls)
+    
+    def test_redis_session_update_is_transactional(self):
+        """Test that a Redis update retries on a concurrent change instead of losing it."""
+        store = self._redis_store(ttl=60)
+        self.run_async(store.create("abc", {"initialized": False, "client": None}))
+        
+        async def concurrent_write():
+            await store.client.set("mcp:sess:abc", b'{"initialized":false,"client":"other"}', ex=60)
+        
+        store.client.before_commit = concurrent_write
+        self.run_async(store.update("abc", initialized=True))
+        
+        self.assertEqual(self.run_async(store.get("abc")), {"initialized": True, "client": "other"})
+        self.assertEqual(store.client.ttls["mcp:sess:abc"], 60)
+        # Updating a missing session does not create it
+        self.run_async(store.update("missing", initialized=True))
+        self.assertFalse(self.run_async(store.exists("missing")))
+    
+    def test_redis_session_store_close(self):
+        """Test that closing the Redis store closes the client and its pool."""
+        store = self._redis_store()
+        self.run_async(store.close())
+        self.assertTrue(store.client.closed)
+        self.assertTrue(store.pool.disconnected)
+
+
 # Standalone test functions for core functionality
 async def test_core_modules_loading():
     """Standalone test for core module loading."""
@@ -140,34 +534,27 @@ async def test_core_modules_loading():
     
     # Test loading core modules
     core_modules = ['tool_manager', 'tool_base', 'tool_definition']
-    core_dir = Path(__file__).parent.parent / "core"
-    
     for module_name in core_modules:
-        module_path = core_dir / f"{module_name}.py"
-        if module_path.exists():
-            try:
-                spec = importlib.util.spec_from_file_location(module_name, module_path)
-                module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(module)
-                test_base.log_test_info(f"Successfully loaded core module: {module_name}")
-            except Exception as e:
-                test_base.log_test_error(f"Failed to load core module {module_name}: {e}")
+        try:
+            load_package_module(f"core.{module_name}", CORE_DIR / f"{module_name}.py")
+            test_base.log_test_info(f"Successfully loaded core module: {module_name}")
+        except FileNotFoundError:
+            continue
+        except Exception as e:
+            test_base.log_test_error(f"Failed to load core module {module_name}: {e}")
     
     test_base.cleanup_test_files()
 
 
 def test_core_directory_structure():
     """Test that core directory has expected structure."""
-    core_dir = Path(__file__).parent.parent / "core"
-    api_dir = Path(__file__).parent.parent / "api"
-    
-    assert core_dir.exists(), "Core directory should exist"
-    assert api_dir.exists(), "API directory should exist"
+    assert CORE_DIR.exists(), "Core directory should exist"
+    assert API_DIR.exists(), "API directory should exist"
     
     # Check for expected core files
     expected_files = ['tool_manager.py', 'tool_base.py', 'tool_definition.py']
     for file_name in expected_files:
-        file_path = core_dir / file_name
+        file_path = CORE_DIR / file_name
         assert file_path.exists(), f"Core file {file_name} should exist"
 
 
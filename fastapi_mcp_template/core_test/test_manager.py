@@ -2,46 +2,116 @@
 
 import os
 import importlib.util
-import inspect
+import sys
+from importlib.machinery import SourceFileLoader
 import asyncio
-from typing import Dict, List, Any, Optional
+import types
+from concurrent.futures import ThreadPoolExecutor
+import unittest
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
+from weakref import WeakKeyDictionary
+
+# sys.modules key prefix for loaded test files, so they cannot shadow real imports
+_TEST_MODULE_PREFIX = "_fastapi_mcp_tests_"
+
+# Test method names per class; weak keys so reloaded test modules do not pin old classes
+_TEST_METHODS_CACHE: "WeakKeyDictionary[type, tuple]" = WeakKeyDictionary()
+
+
+def _test_methods(cls) -> tuple:
+    """Get the sorted test method names of a class, including inherited ones (cached)."""
+    methods = _TEST_METHODS_CACHE.get(cls)
+    if methods is None:
+        # Walk the class dicts instead of building the full dir() listing
+        methods = tuple(sorted({
+            name for klass in cls.__mro__ for name in vars(klass) if name.startswith('test_')
+        }))
+        _TEST_METHODS_CACHE[cls] = methods
+    return methods
+
+
+@dataclass(slots=True)
+class RunResult:
+    """Outcome of a single test method or function."""
+    name: str
+    success: bool
+    error: Optional[str] = None
+
+
+def _fixture_flags(cls) -> Dict[str, bool]:
+    """Work out once which setUp/tearDown hooks a test class provides."""
+    if issubclass(cls, unittest.TestCase):
+        # TestCase defines all four hooks
+        return dict.fromkeys(('has_setup', 'has_teardown', 'has_setup_class', 'has_teardown_class'), True)
+    return {
+        'has_setup': callable(getattr(cls, 'setUp', None)),
+        'has_teardown': callable(getattr(cls, 'tearDown', None)),
+        'has_setup_class': callable(getattr(cls, 'setUpClass', None)),
+        'has_teardown_class': callable(getattr(cls, 'tearDownClass', None)),
+    }
+
+
+@lru_cache(maxsize=1)
+def _load_test_base_module(path_str: str):
+    """Load the test_base module from a file once, or None if the file is missing."""
+    test_base_path = Path(path_str)
+    if not test_base_path.exists():
+        return None
+    spec = importlib.util.spec_from_file_location("test_base", test_base_path)
+    test_base_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(test_base_module)
+    return test_base_module
+
+
+class MinimalTestBase:
+    """Fallback test base used when TestBase cannot be loaded."""
+    
+    def log_test_info(self, message: str):
+        print(f"[TEST INFO] {message}")
+    
+    def log_test_error(self, message: str):
+        print(f"[TEST ERROR] {message}")
+
+
+_MINIMAL_TEST_BASE = MinimalTestBase()
 
 
 class TestManager:
     """Manages dynamic test loading and execution."""
     
-    def __init__(self, tests_directory: str = "/app/tests"):
+    def __init__(self, tests_directory: str = "/app/tests", max_concurrency: Optional[int] = None):
         self.tests_directory = Path(tests_directory)
+        # Test classes and functions run at most this many at a time
+        self.max_concurrency = max_concurrency or max(1, (os.cpu_count() or 1) - 2)
+        # Dedicated pool for synchronous test bodies, so they neither block the event
+        # loop nor compete with the application for the default executor
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="test-runner")
         self.registered_tests: Dict[str, Dict[str, Any]] = {}
         self.test_instances: Dict[str, Any] = {}
+        # Discovery caches: test file -> (mtime_ns, test info), and the file listing
+        self._discover_cache: Dict[Path, Tuple[int, Optional[Dict[str, Any]]]] = {}
+        self._test_files_cache: Optional[Tuple[int, List[str]]] = None
+        # Test files that failed to import: path -> (mtime_ns, error message)
+        self._failed_files: Dict[Path, Tuple[int, str]] = {}
         self.test_base = self._load_test_base()
     
     def _has_test_methods(self, cls) -> bool:
         """Check if a class has test methods."""
-        return any(method.startswith('test_') for method in dir(cls))
+        return bool(_test_methods(cls))
     
     def _load_test_base(self):
         """Dynamically load TestBase."""
         try:
-            # Try to import TestBase from test_base module
-            test_base_path = Path(__file__).parent / "test_base.py"
-            if test_base_path.exists():
-                spec = importlib.util.spec_from_file_location("test_base", test_base_path)
-                test_base_module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(test_base_module)
-                
-                if hasattr(test_base_module, 'TestBase'):
-                    return test_base_module.TestBase()
+            # Try to import TestBase from test_base module (executed once per process)
+            test_base_module = _load_test_base_module(str(Path(__file__).parent / "test_base.py"))
+            if hasattr(test_base_module, 'TestBase'):
+                return test_base_module.TestBase()
             
             # Fallback to a minimal test base
-            class MinimalTestBase:
-                def log_test_info(self, message: str):
-                    print(f"[TEST INFO] {message}")
-                def log_test_error(self, message: str):
-                    print(f"[TEST ERROR] {message}")
-            
-            return MinimalTestBase()
+            return _MINIMAL_TEST_BASE
             
         except Exception as e:
             print(f"Could not load TestBase: {e}")
@@ -56,9 +126,9 @@ class TestManager:
             return tests
         
         # Scan for test files
-        for file_path in self.tests_directory.glob("test_*.py"):
+        for file_path, mtime_ns in self._test_files():
             try:
-                test_info = await self._load_test_file(file_path)
+                test_info = self._load_test_file(file_path, mtime_ns)
                 if test_info:
                     tests.append(test_info)
                     self.test_base.log_test_info(f"Discovered test: {test_info['name']}")
@@ -67,38 +137,122 @@ class TestManager:
         
         return tests
     
-    async def _load_test_file(self, file_path: Path) -> Optional[Dict[str, Any]]:
+    def _test_files(self) -> List[Tuple[Path, int]]:
+        """List test files with their mtimes, rescanning the directory only when it changed."""
+        dir_mtime_ns = os.stat(self.tests_directory).st_mtime_ns
+        if self._test_files_cache is None or self._test_files_cache[0] != dir_mtime_ns:
+            # Filter on the DirEntry name before touching the file itself
+            with os.scandir(self.tests_directory) as entries:
+                paths = [
+                    entry.path for entry in entries
+                    if entry.name.startswith('test_') and entry.name.endswith('.py') and entry.is_file()
+                ]
+            self._test_files_cache = (dir_mtime_ns, paths)
+        
+        # Editing a file in place does not touch the directory mtime, so the
+        # files themselves are still stat'ed on every scan
+        test_files = []
+        for path in self._test_files_cache[1]:
+            try:
+                test_files.append((Path(path), os.stat(path).st_mtime_ns))
+            except FileNotFoundError:
+                continue
+        return test_files
+    
+    def _load_test_file(self, file_path: Path, mtime_ns: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Load a single test file, reusing the cached result while it is unchanged."""
+        if mtime_ns is None:
+            mtime_ns = file_path.stat().st_mtime_ns
+        
+        # A broken file is only imported again once it changes
+        failed = self._failed_files.get(file_path)
+        if failed and failed[0] == mtime_ns:
+            self.test_base.log_test_error(f"Skipping test file {file_path} (unchanged since it failed): {failed[1]}")
+            return None
+        
+        cached = self._discover_cache.get(file_path)
+        if cached and cached[0] == mtime_ns:
+            test_info = cached[1]
+            if test_info:
+                self.registered_tests[test_info['name']] = test_info
+            return test_info
+        
+        self._failed_files.pop(file_path, None)
+        test_info = self._read_test_file(file_path, mtime_ns)
+        if file_path not in self._failed_files:
+            self._discover_cache[file_path] = (mtime_ns, test_info)
+        return test_info
+    
+    def invalidate_cache(self) -> None:
+        """Forget cached test discovery so the next scan reloads every file."""
+        importlib.invalidate_caches()
+        self._discover_cache.clear()
+        self._test_files_cache = None
+        self._failed_files.clear()
+        for module_name in [name for name in sys.modules if name.startswith(_TEST_MODULE_PREFIX)]:
+            del sys.modules[module_name]
+    
+    def _import_test_module(self, file_path: Path, mtime_ns: int):
+        """Import a test file, reusing the module in sys.modules while the file is unchanged."""
+        module_name = f"{_TEST_MODULE_PREFIX}{file_path.stem}"
+        module = sys.modules.get(module_name)
+        if module is not None and getattr(module, '__fastapi_mcp_mtime__', None) == mtime_ns:
+            return module
+        
+        # The source path is already known, so build the spec from a source loader directly
+        spec = importlib.util.spec_from_loader(module_name, SourceFileLoader(module_name, str(file_path)))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[module_name]
+            raise
+        module.__fastapi_mcp_mtime__ = mtime_ns
+        return module
+    
+    def _read_test_file(self, file_path: Path, mtime_ns: Optional[int] = None) -> Optional[Dict[str, Any]]:
         """Load a single test file."""
         try:
+            if mtime_ns is None:
+                mtime_ns = file_path.stat().st_mtime_ns
             # Import the test module
-            spec = importlib.util.spec_from_file_location(file_path.stem, file_path)
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)            
+            module = self._import_test_module(file_path, mtime_ns)
             # Find test classes
             test_classes = []
             test_functions = []
             
-            for name, obj in inspect.getmembers(module):
-                if inspect.isclass(obj):
+            for name, obj in module.__dict__.items():
+                if name.startswith('_'):
+                    continue
+                if isinstance(obj, type):
                     # Check if it's a test class (inherits from unittest.TestCase or has test methods)
                     if (hasattr(obj, 'setUp') or hasattr(obj, 'test_') or 
                         name.startswith('Test') or self._has_test_methods(obj)):
+                        methods = list(_test_methods(obj))
                         test_classes.append({
                             'name': name,
                             'class': obj,
-                            'methods': [m for m in dir(obj) if m.startswith('test_')]
+                            'methods': methods,
+                            'methods_set': frozenset(methods),
+                            # Resolved once here rather than on every run
+                            'async_methods': frozenset(
+                                method for method in methods
+                                if asyncio.iscoroutinefunction(getattr(obj, method, None))
+                            ),
+                            **_fixture_flags(obj)
                         })
-                elif inspect.isfunction(obj) and name.startswith('test_'):
+                elif type(obj) is types.FunctionType and name.startswith('test_'):
                     test_functions.append({
                         'name': name,
-                        'function': obj
+                        'function': obj,
+                        'is_coro': asyncio.iscoroutinefunction(obj)
                     })
             
             if test_classes or test_functions:
                 test_info = {
                     'name': file_path.stem,
                     'file_path': str(file_path),
-                    'module': module,
                     'test_classes': test_classes,
                     'test_functions': test_functions,
                     'description': getattr(module, '__doc__', f"Tests from {file_path.name}")
@@ -109,147 +263,210 @@ class TestManager:
             
         except Exception as e:
             self.test_base.log_test_error(f"Error loading test file {file_path}: {e}")
+            if mtime_ns is not None:
+                self._failed_files[file_path] = (mtime_ns, str(e))
             return None
     
     async def run_test(self, test_name: str, specific_test: Optional[str] = None) -> Dict[str, Any]:
         """Run a specific test or all tests in a test file."""
+        return await self._run_test(test_name, specific_test, asyncio.Semaphore(self.max_concurrency))
+    
+    async def _run_test(self, test_name: str, specific_test: Optional[str],
+                        semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        """Run the tests of a test file concurrently, bounded by semaphore."""
         if test_name not in self.registered_tests:
             raise ValueError(f"Test {test_name} not found")
         
         test_info = self.registered_tests[test_name]
-        results = {
-            'test_name': test_name,
-            'passed': 0,
-            'failed': 0,
-            'errors': [],
-            'details': []
-        }
         
-        # Run test classes
+        # Methods of one test class run in order (they share class fixtures);
+        # test classes and test functions run concurrently
+        jobs = []
+        job_errors = []
         for test_class_info in test_info['test_classes']:
-            try:
-                test_class = test_class_info['class']
-                
-                # If specific test method is requested
-                if specific_test:
-                    if specific_test in test_class_info['methods']:
-                        result = await self._run_test_method(test_class, specific_test)
-                        results['details'].append(result)
-                        if result['success']:
-                            results['passed'] += 1
-                        else:
-                            results['failed'] += 1
-                            results['errors'].append(result['error'])
-                else:
-                    # Run all test methods
-                    for method_name in test_class_info['methods']:
-                        result = await self._run_test_method(test_class, method_name)
-                        results['details'].append(result)
-                        if result['success']:
-                            results['passed'] += 1
-                        else:
-                            results['failed'] += 1
-                            results['errors'].append(result['error'])
-                            
-            except Exception as e:
-                results['failed'] += 1
-                results['errors'].append(f"Error running test class {test_class_info['name']}: {e}")
+            if specific_test:
+                methods = [specific_test] if specific_test in test_class_info['methods_set'] else None
+            else:
+                methods = test_class_info['methods']
+            if methods:
+                jobs.append(self._bounded(semaphore, self._run_in_executor(
+                    self._run_test_class, test_class_info, methods
+                )))
+                job_errors.append(f"Error running test class {test_class_info['name']}")
         
-        # Run test functions
         for test_func_info in test_info['test_functions']:
+            if not specific_test or test_func_info['name'] == specific_test:
+                jobs.append(self._bounded(semaphore, self._run_test_function(
+                    test_func_info['function'], test_func_info['name'], test_func_info['is_coro']
+                )))
+                job_errors.append(f"Error running test function {test_func_info['name']}")
+        
+        outcomes = await asyncio.gather(*jobs, return_exceptions=True)
+        
+        # Accumulate in locals and build the result dict once
+        passed = failed = 0
+        errors = []
+        details = []
+        for outcome, job_error in zip(outcomes, job_errors):
+            if isinstance(outcome, BaseException):
+                failed += 1
+                errors.append(f"{job_error}: {outcome}")
+                continue
+            
+            for result in outcome if isinstance(outcome, list) else (outcome,):
+                details.append(result)
+                if result.success:
+                    passed += 1
+                else:
+                    failed += 1
+                    errors.append(result.error)
+        
+        return {
+            'test_name': test_name,
+            'passed': passed,
+            'failed': failed,
+            'errors': errors,
+            'details': details
+        }
+    
+    async def _run_in_executor(self, func, *args) -> Any:
+        """Run a synchronous callable on the test runner pool."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+    
+    def close(self) -> None:
+        """Shut down the test runner pool, dropping queued test jobs."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+    
+    @staticmethod
+    async def _bounded(semaphore: asyncio.Semaphore, coro) -> Any:
+        """Await a coroutine while holding the semaphore."""
+        async with semaphore:
+            return await coro
+    
+    def _run_test_class(self, test_class_info: Dict[str, Any], method_names: List[str]) -> List[RunResult]:
+        """Run test methods of a class in order (called in a worker thread)."""
+        test_class = test_class_info['class']
+        async_methods = test_class_info['async_methods']
+        if test_class_info['has_setup_class']:
+            test_class.setUpClass()
+        try:
+            if not getattr(test_class, '_share_instance', False):
+                # Fresh instance with its own setUp/tearDown for every method
+                return [self._run_test_method(test_class_info, method_name, method_name in async_methods)
+                        for method_name in method_names]
+            
+            # Opted in: one instance and one setUp/tearDown cycle shared by all methods
+            test_instance = test_class()
             try:
-                if not specific_test or test_func_info['name'] == specific_test:
-                    result = await self._run_test_function(test_func_info['function'], test_func_info['name'])
-                    results['details'].append(result)
-                    if result['success']:
-                        results['passed'] += 1
-                    else:
-                        results['failed'] += 1
-                        results['errors'].append(result['error'])
-                        
+                if test_class_info['has_setup']:
+                    test_instance.setUp()
             except Exception as e:
-                results['failed'] += 1
-                results['errors'].append(f"Error running test function {test_func_info['name']}: {e}")
-        
-        return results
+                return [self._method_result(test_class, method_name, e) for method_name in method_names]
+            
+            try:
+                return [self._run_loaded_test_method(test_class, test_instance, method_name,
+                                                     method_name in async_methods)
+                        for method_name in method_names]
+            finally:
+                if test_class_info['has_teardown']:
+                    test_instance.tearDown()
+        finally:
+            if test_class_info['has_teardown_class']:
+                test_class.tearDownClass()
     
-    async def _run_test_method(self, test_class, method_name: str) -> Dict[str, Any]:
-        """Run a single test method."""
+    def _run_test_method(self, test_class_info: Dict[str, Any], method_name: str, is_coro: bool) -> RunResult:
+        """Run a single test method on a fresh instance."""
+        test_class = test_class_info['class']
         try:
             # Create test instance
             test_instance = test_class()
             
             # Setup if available
-            if hasattr(test_instance, 'setUp'):
+            if test_class_info['has_setup']:
                 test_instance.setUp()
             
-            # Get the test method
-            test_method = getattr(test_instance, method_name)
-            
-            # Run the test method
-            if asyncio.iscoroutinefunction(test_method):
-                await test_method()
-            else:
-                test_method()
+            self._call_test_method(test_instance, method_name, is_coro)
             
             # Teardown if available
-            if hasattr(test_instance, 'tearDown'):
+            if test_class_info['has_teardown']:
                 test_instance.tearDown()
             
-            return {
-                'name': f"{test_class.__name__}.{method_name}",
-                'success': True,
-                'error': None
-            }
+            return self._method_result(test_class, method_name)
             
         except Exception as e:
-            return {
-                'name': f"{test_class.__name__}.{method_name}",
-                'success': False,
-                'error': str(e)
-            }
+            return self._method_result(test_class, method_name, e)
     
-    async def _run_test_function(self, test_function, function_name: str) -> Dict[str, Any]:
+    def _run_loaded_test_method(self, test_class, test_instance, method_name: str,
+                                is_coro: bool) -> RunResult:
+        """Run a single test method on an already set up instance."""
+        try:
+            self._call_test_method(test_instance, method_name, is_coro)
+            return self._method_result(test_class, method_name)
+        except Exception as e:
+            return self._method_result(test_class, method_name, e)
+    
+    @staticmethod
+    def _call_test_method(test_instance, method_name: str, is_coro: bool) -> None:
+        """Call a test method (async methods get their own loop in this worker thread)."""
+        test_method = getattr(test_instance, method_name)
+        if is_coro:
+            asyncio.run(test_method())
+        else:
+            test_method()
+    
+    @staticmethod
+    def _method_result(test_class, method_name: str, error: Optional[Exception] = None) -> RunResult:
+        """Build the result entry of a test method."""
+        if error is None:
+            return RunResult(f"{test_class.__name__}.{method_name}", True)
+        return RunResult(f"{test_class.__name__}.{method_name}", False, str(error))
+    
+    async def _run_test_function(self, test_function, function_name: str, is_coro: bool) -> RunResult:
         """Run a single test function."""
         try:
-            if asyncio.iscoroutinefunction(test_function):
+            if is_coro:
                 await test_function()
             else:
-                test_function()
+                # Keep synchronous test bodies off the event loop
+                await self._run_in_executor(test_function)
             
-            return {
-                'name': function_name,
-                'success': True,
-                'error': None
-            }
+            return RunResult(function_name, True)
             
         except Exception as e:
-            return {
-                'name': function_name,
-                'success': False,
-                'error': str(e)
-            }
+            return RunResult(function_name, False, str(e))
     
     async def run_all_tests(self) -> Dict[str, Any]:
         """Run all discovered tests."""
         await self.discover_tests()
         
-        all_results = {
-            'total_tests': len(self.registered_tests),
-            'passed': 0,
-            'failed': 0,
-            'errors': [],
-            'test_results': {}
-        }
+        # All test files share one concurrency limit
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        test_names = list(self.registered_tests)
+        results = await asyncio.gather(
+            *(self._run_test(test_name, None, semaphore) for test_name in test_names),
+            return_exceptions=True
+        )
         
-        for test_name in self.registered_tests:
-            result = await self.run_test(test_name)
-            all_results['test_results'][test_name] = result
-            all_results['passed'] += result['passed']
-            all_results['failed'] += result['failed']
-            all_results['errors'].extend(result['errors'])
+        passed = failed = 0
+        errors = []
+        test_results = {}
+        for test_name, result in zip(test_names, results):
+            if isinstance(result, BaseException):
+                failed += 1
+                errors.append(f"Error running test {test_name}: {result}")
+                continue
+            test_results[test_name] = result
+            passed += result['passed']
+            failed += result['failed']
+            errors.extend(result['errors'])
         
-        return all_results
+        return {
+            'total_tests': len(test_names),
+            'passed': passed,
+            'failed': failed,
+            'errors': errors,
+            'test_results': test_results
+        }
     
     def list_tests(self) -> List[Dict[str, Any]]:
         """List all registered tests."""
@@ -1,55 +1,112 @@
 import asyncio
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import List, Optional
 from fastapi import FastAPI
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
 from fastapi_mcp_template.core.tool_manager import ToolManager
 from fastapi_mcp_template.core.tool_base import ToolBase
+from fastapi_mcp_template.api.responses import ORJSONResponse
 from fastapi_mcp_template.api.routes import create_dynamic_routes
 from fastapi_mcp_template.config import get_settings
 
-# Test imports (only if tests are enabled)
-try:
-    from fastapi_mcp_template.core_test.test_manager import TestManager
-    TEST_SUPPORT_AVAILABLE = True
-except ImportError:
-    TEST_SUPPORT_AVAILABLE = False
-
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# While the app runs, the root handlers sit behind a queue listener thread so
+# that log I/O from async route handlers never blocks the event loop
+_log_listener: Optional[QueueListener] = None
+_root_handlers: List[logging.Handler] = []
+
+
+def _start_log_listener() -> None:
+    """Move the root handlers onto a listener thread (no-op if already started)."""
+    global _log_listener, _root_handlers
+    if _log_listener is not None:
+        return
+    root_logger = logging.getLogger()
+    log_queue = queue.SimpleQueue()
+    _root_handlers = list(root_logger.handlers)
+    _log_listener = QueueListener(log_queue, *_root_handlers, respect_handler_level=True)
+    _log_listener.start()
+    root_logger.handlers = [QueueHandler(log_queue)]
+
+
+def _stop_log_listener() -> None:
+    """Flush queued records and put the original root handlers back."""
+    global _log_listener
+    if _log_listener is None:
+        return
+    logging.getLogger().handlers = _root_handlers
+    _log_listener.stop()
+    _log_listener = None
+
 # Global tool manager
 tool_manager = ToolManager()
 
-# Global test manager (if available)
-test_manager = TestManager() if TEST_SUPPORT_AVAILABLE else None
+
+@lru_cache(maxsize=1)
+def _settings_dict():
+    """Serialize the settings once per process for the tool base config."""
+    return get_settings().model_dump()
+
+
+@lru_cache(maxsize=1)
+def _get_test_manager():
+    """Import and create the test manager on first use (None if test support is unavailable)."""
+    try:
+        from fastapi_mcp_template.core_test.test_manager import TestManager
+    except ImportError:
+        return None
+    return TestManager()
+
+
+TEST_SUPPORT_UNAVAILABLE = {
+    "test_support_available": False,
+    "message": "Test support not available. Install test dependencies to enable testing."
+}
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
-    # Setup tool base with dependencies
-    tool_base = ToolBase()
-    tool_base.set_logger(logger)
-    tool_base.set_config(get_settings().dict())
-    
-    tool_manager.set_tool_base(tool_base)
-    
-    # Discover and load tools
-    logger.info("Discovering tools...")
-    tools = await tool_manager.discover_tools()
-    logger.info(f"Loaded {len(tools)} tools: {[t.name for t in tools]}")
-    
-    # Create dynamic routes
-    create_dynamic_routes(app, tool_manager)
-    
-    yield
-    
-    # Cleanup
-    logger.info("Shutting down...")
+    _start_log_listener()
+    try:
+        # Setup tool base with dependencies
+        tool_base = ToolBase()
+        tool_base.set_logger(logger)
+        tool_base.set_config(_settings_dict())
+        
+        tool_manager.set_tool_base(tool_base)
+        
+        # Discover and load tools
+        logger.info("Discovering tools...")
+        tools = await tool_manager.discover_tools()
+        logger.info(f"Loaded {len(tools)} tools: {[t.name for t in tools]}")
+        
+        # Create dynamic routes
+        create_dynamic_routes(app, tool_manager)
+        
+        yield
+        
+        # Cleanup
+        logger.info("Shutting down...")
+        await tool_manager.close_tools()
+        await app.state.session_store.close()
+        if _get_test_manager.cache_info().currsize:
+            # Only shut down the test manager if a /tests endpoint ever created it
+            test_manager = _get_test_manager()
+            if test_manager is not None:
+                test_manager.close()
+    finally:
+        _stop_log_listener()
 
 
 def create_app() -> FastAPI:
@@ -58,7 +115,8 @@ def create_app() -> FastAPI:
         title="MCP Template Server",
         description="Dynamic MCP server with FastAPI for tool mounting and file conversion",
         version="1.0.0",
-        lifespan=lifespan
+        lifespan=lifespan,
+        default_response_class=ORJSONResponse
     )
     
     # Add CORS middleware
@@ -76,24 +134,30 @@ def create_app() -> FastAPI:
 app = create_app()
 
 
+# Health probes are hit every few seconds, so their body is serialized only once
+HEALTHY_BODY = b'{"status":"healthy"}'
+
+
 @app.get("/health")
 async def health():
     """Health check endpoint."""
-    return {"status": "healthy"}
+    return Response(content=HEALTHY_BODY, media_type="application/json")
 
 
 @app.get("/api/health")
 async def api_health():
     """API health check endpoint for Docker."""
-    return {"status": "healthy"}
+    return Response(content=HEALTHY_BODY, media_type="application/json")
 
 
 @app.get("/tools")
 async def list_tools():
     """List all available tools."""
-    return {
-        "tools": tool_manager.list_tools()
-    }
+    # Splice the cached, pre-serialized tool list into the response body
+    return Response(
+        content=b'{"tools":' + tool_manager.list_tools_raw() + b'}',
+        media_type="application/json"
+    )
 
 
 @app.post("/tools/reload")
@@ -107,72 +171,98 @@ async def reload_tools():
     }
 
 
-# Test endpoints (only if test support is available)
-if TEST_SUPPORT_AVAILABLE and test_manager:
-    
-    @app.get("/tests")
-    async def list_tests():
-        """List all available tests."""
-        tests = await test_manager.discover_tests()
+# Test endpoints (the test manager is only loaded when one of them is first hit)
+@app.get("/tests", response_class=ORJSONResponse)
+async def list_tests():
+    """List all available tests."""
+    test_manager = _get_test_manager()
+    if test_manager is None:
+        return TEST_SUPPORT_UNAVAILABLE
+    tests = await test_manager.discover_tests()
+    return {
+        "tests": test_manager.list_tests(),
+        "total": len(tests)
+    }
+
+
+@app.post("/tests/run/{test_name}", response_class=ORJSONResponse)
+async def run_test(test_name: str, specific_test: str = None):
+    """Run a specific test or all tests in a test file."""
+    test_manager = _get_test_manager()
+    if test_manager is None:
+        return TEST_SUPPORT_UNAVAILABLE
+    try:
+        result = await test_manager.run_test(test_name, specific_test)
         return {
-            "tests": test_manager.list_tests(),
-            "total": len(tests)
+            "success": True,
+            "result": result
         }
-    
-    @app.post("/tests/run/{test_name}")
-    async def run_test(test_name: str, specific_test: str = None):
-        """Run a specific test or all tests in a test file."""
-        try:
-            result = await test_manager.run_test(test_name, specific_test)
-            return {
-                "success": True,
-                "result": result
-            }
-        except ValueError as e:
-            return {
-                "success": False,
-                "error": str(e)
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "error": f"Test execution failed: {str(e)}"
-            }
-    
-    @app.post("/tests/run-all")
-    async def run_all_tests():
-        """Run all discovered tests."""
-        try:
-            result = await test_manager.run_all_tests()
-            return {
-                "success": True,
-                "result": result
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "error": f"Test execution failed: {str(e)}"
-            }
-    
-    @app.get("/tests/status")
-    async def test_status():
-        """Get test system status."""
+    except ValueError as e:
+        return {
+            "success": False,
+            "error": str(e)
+        }
+    except Exception as e:
         return {
-            "test_support_available": True,
-            "tests_directory": str(test_manager.tests_directory),
-            "registered_tests": len(test_manager.registered_tests)
+            "success": False,
+            "error": f"Test execution failed: {str(e)}"
         }
 
-else:
-    @app.get("/tests/status")
-    async def test_status():
-        """Get test system status when tests are not available."""
+
+@app.post("/tests/run-all", response_class=ORJSONResponse)
+async def run_all_tests():
+    """Run all discovered tests."""
+    test_manager = _get_test_manager()
+    if test_manager is None:
+        return TEST_SUPPORT_UNAVAILABLE
+    try:
+        result = await test_manager.run_all_tests()
+        return {
+            "success": True,
+            "result": result
+        }
+    except Exception as e:
         return {
-            "test_support_available": False,
-            "message": "Test support not available. Install test dependencies to enable testing."
+            "success": False,
+            "error": f"Test execution failed: {str(e)}"
         }
 
 
+@app.post("/tests/invalidate")
+async def invalidate_tests():
+    """Drop cached test discovery so changed test files are reloaded."""
+    test_manager = _get_test_manager()
+    if test_manager is None:
+        return TEST_SUPPORT_UNAVAILABLE
+    test_manager.invalidate_cache()
+    return {
+        "message": "Test discovery cache cleared"
+    }
+
+
+@lru_cache(maxsize=1)
+def _test_status_static() -> Optional[dict]:
+    """Build the fixed part of the test status once (None if test support is unavailable)."""
+    test_manager = _get_test_manager()
+    if test_manager is None:
+        return None
+    return {
+        "test_support_available": True,
+        "tests_directory": str(test_manager.tests_directory)
+    }
+
+
+# Kept async: nothing is awaited, and a sync handler would be dispatched to the threadpool
+@app.get("/tests/status")
+async def test_status():
+    """Get test system status."""
+    status = _test_status_static()
+    if status is None:
+        return TEST_SUPPORT_UNAVAILABLE
+    # Only the test count can change, and it is a dict length
+    return {**status, "registered_tests": len(_get_test_manager().registered_tests)}
+
+
 def main():
     """Main entry point."""
     settings = get_settings()
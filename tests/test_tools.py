@@ -3,10 +3,13 @@
 import unittest
 import asyncio
 import importlib.util
+import os
 import sys
+from functools import lru_cache
 from pathlib import Path
 
 
+@lru_cache(maxsize=1)
 def load_test_base():
     """Dynamically load test base classes."""
     try:
@@ -55,7 +58,7 @@ class TestFileConverterTool(AsyncTestCase):
             self.skipTest("Test base not available")
         
         try:
-            tool = await self.tool_test_base.load_test_tool("file_converter")
+            tool = self.tool_test_base.load_test_tool("file_converter")
             self.assertIsNotNone(tool)
             self.tool_test_base.log_test_info("File converter tool loaded successfully")
         except FileNotFoundError:
@@ -85,6 +88,68 @@ class TestFileConverterTool(AsyncTestCase):
             self.skipTest("file_converter tool not available")
         except Exception as e:
             self.skipTest(f"file_converter test failed: {e}")
+    
+    def _load_converter(self, **config):
+        """Load the file converter with extra tool configuration."""
+        if not self.tool_test_base:
+            self.skipTest("Test base not available")
+        tool = self.tool_test_base.load_test_tool("file_converter")
+        self.tool_test_base.config.update(config)
+        return tool
+    
+    def test_file_converter_batch_with_cpu_count_workers(self):
+        """Test that a batch converts with conversion_workers=-1 (the CPU count)."""
+        tool = self._load_converter(conversion_workers=-1)
+        result = self.run_async(tool.execute(files=[
+            {"filename": "a.md", "file_content": "# A"},
+            {"filename": "b.md", "file_content": "# B"}
+        ]))
+        self.assertTrue(result["success"])
+        self.assertEqual([item["markdown"] for item in result["results"]], ["# A", "# B"])
+    
+    def test_file_converter_batch_items_do_not_stream(self):
+        """Test that batch items asking to stream still return serializable results."""
+        tool = self._load_converter()
+        result = self.run_async(tool.execute(files=[{"filename": "a.md", "file_content": "# A", "stream": True}]))
+        self.assertEqual(result["results"][0]["markdown"], "# A")
+    
+    def test_file_converter_close_shuts_down_pool(self):
+        """Test that closing the converter shuts down its conversion pool."""
+        tool = self._load_converter()
+        pool = tool._get_conversion_pool(1)
+        tool.close()
+        self.assertIsNone(tool._conversion_pool)
+        with self.assertRaises(RuntimeError):
+            pool.submit(len, b"")
+    
+    def test_file_converter_text_without_markitdown(self):
+        """Test that Markdown files convert even when MarkItDown is not installed."""
+        tool = self._load_converter()
+        tool.markitdown = None
+        result = self.run_async(tool.execute(filename="notes.md", file_content="# Notes"))
+        self.assertTrue(result["success"])
+        self.assertEqual(result["markdown"], "# Notes")
+        
+        result = self.run_async(tool.execute(filename="notes.pdf", file_content=b"%PDF-1.4"))
+        self.assertFalse(result["success"])
+        self.assertIn("MarkItDown", result["error"])
+    
+    def test_file_converter_cache_key_includes_charset(self):
+        """Test that a cached conversion is not reused for a different declared charset."""
+        tool = self._load_converter()
+        data = "caf\u00e9".encode("latin-1")
+        latin = self.run_async(tool.execute(filename="a.txt", file_content=data, content_type="text/plain; charset=latin-1"))
+        undeclared = self.run_async(tool.execute(filename="a.txt", file_content=data))
+        self.assertEqual(latin["markdown"], "caf\u00e9")
+        self.assertNotIn("cached", undeclared)
+    
+    def test_file_converter_does_not_cache_empty_markdown(self):
+        """Test that an empty conversion is retried instead of served from the cache."""
+        tool = self._load_converter()
+        self.run_async(tool.execute(filename="empty.md", file_content=" \n"))
+        result = self.run_async(tool.execute(filename="empty.md", file_content=" \n"))
+        self.assertTrue(result["success"])
+        self.assertNotIn("cached", result)
 
 
 class TestTextProcessorTool(AsyncTestCase):
@@ -109,7 +174,7 @@ class TestTextProcessorTool(AsyncTestCase):
             self.skipTest("Test base not available")
         
         try:
-            tool = await self.tool_test_base.load_test_tool("text_processor")
+            tool = self.tool_test_base.load_test_tool("text_processor")
             self.assertIsNotNone(tool)
             self.tool_test_base.log_test_info("Text processor tool loaded successfully")
         except FileNotFoundError:
@@ -135,6 +200,39 @@ class TestTextProcessorTool(AsyncTestCase):
         except Exception as e:
             self.skipTest(f"text_processor test failed: {e}")
 
+    def test_text_processor_extract_emails(self):
+        """Test that email extraction ignores '|' in the top-level domain."""
+        if not self.tool_test_base:
+            self.skipTest("Test base not available")
+
+        try:
+            parameters = {
+                "text": "Mail ann@example.org or bob@example.c|m",
+                "operation": "extract_emails"
+            }
+            result = self.run_async(self.tool_test_base.execute_tool_test("text_processor", parameters))
+        except FileNotFoundError:
+            self.skipTest("text_processor tool not available")
+
+        self.assertEqual(result["result"], "ann@example.org")
+
+    def test_text_processor_extract_emails_limit(self):
+        """Test that email extraction stops after the requested number of addresses."""
+        if not self.tool_test_base:
+            self.skipTest("Test base not available")
+
+        try:
+            parameters = {
+                "text": "ann@example.org, bob@example.com, eve@example.net",
+                "operation": "extract_emails",
+                "limit": 2
+            }
+            result = self.run_async(self.tool_test_base.execute_tool_test("text_processor", parameters))
+        except FileNotFoundError:
+            self.skipTest("text_processor tool not available")
+
+        self.assertEqual(result["result"], "ann@example.org\nbob@example.com")
+
 
 class TestUrlFetcherTool(AsyncTestCase):
     """Test URL fetcher tool."""
@@ -158,7 +256,7 @@ class TestUrlFetcherTool(AsyncTestCase):
             self.skipTest("Test base not available")
         
         try:
-            tool = await self.tool_test_base.load_test_tool("url_fetcher")
+            tool = self.tool_test_base.load_test_tool("url_fetcher")
             self.assertIsNotNone(tool)
             self.tool_test_base.log_test_info("URL fetcher tool loaded successfully")
         except FileNotFoundError:
@@ -198,14 +296,17 @@ async def test_tool_loading_standalone():
     
     # List available tools
     tools_dir = Path(__file__).parent.parent / "tools"
-    available_tools = [f.stem for f in tools_dir.glob("*.py") if not f.name.startswith("__")]
+    available_tools = [
+        entry.name[:-3] for entry in os.scandir(tools_dir)
+        if entry.name.endswith(".py") and not entry.name.startswith("_")
+    ]
     
     tool_test_base.log_test_info(f"Available tools: {available_tools}")
     
     # Try to load each tool
     for tool_name in available_tools:
         try:
-            tool = await tool_test_base.load_test_tool(tool_name)
+            tool = tool_test_base.load_test_tool(tool_name)
             tool_test_base.log_test_info(f"Successfully loaded tool: {tool_name}")
         except Exception as e:
             tool_test_base.log_test_info(f"Could not load tool {tool_name}: {e}")
@@ -222,15 +323,15 @@ def test_tools_directory_structure():
     assert requirements_dir.exists(), "Tools requirements directory should exist"
     
     # Check for some expected tool files
-    tool_files = list(tools_dir.glob("*.py"))
-    assert len(tool_files) > 0, "Should have at least one tool file"
+    tool_names = [entry.name[:-3] for entry in os.scandir(tools_dir) if entry.name.endswith(".py")]
+    assert len(tool_names) > 0, "Should have at least one tool file"
     
     # Check that each tool has a corresponding requirements file
-    for tool_file in tool_files:
-        if not tool_file.name.startswith("__"):
-            req_file = requirements_dir / f"{tool_file.stem}.txt"
+    for tool_name in tool_names:
+        if not tool_name.startswith("_"):
+            req_file = requirements_dir / f"{tool_name}.txt"
             if not req_file.exists():
-                print(f"Warning: No requirements file found for tool {tool_file.stem}")
+                print(f"Warning: No requirements file found for tool {tool_name}")
 
 
 def test_tool_requirements_files():
@@ -0,0 +1,75 @@
+"""
+Shared Tool Classes
+
+Definition, schema and interface classes shared by the tools in this directory.
+Like the tools themselves, this module has no imports from the core service.
+Files starting with an underscore are not loaded as tools.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional
+
+
+@dataclass(slots=True)
+class ToolDefinition:
+    """Definition structure for a tool."""
+    name: str
+    description: str
+    endpoint: str
+    tool_type: str  # Accepts any string
+    version: str = "1.0.0"
+    _dict: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the dictionary form, built on first use (fields are not changed after construction).
+        
+        Definitions are shared by every instance of a tool class, so callers get
+        a copy they are free to modify.
+        """
+        if self._dict is None:
+            self._dict = {
+                "name": self.name,
+                "description": self.description,
+                "endpoint": self.endpoint,
+                "type": self.tool_type,  # Direct string value
+                "version": self.version
+            }
+        return dict(self._dict)
+
+
+@dataclass(slots=True)
+class ToolSchema:
+    """Schema definition for tool parameters."""
+    properties: Dict[str, Any]
+    required: Optional[list] = None
+    _dict: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.required = self.required or []
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the JSON schema form, built on first use (fields are not changed after construction).
+        
+        Returns a copy whose required list can be modified without affecting
+        the shared schema.
+        """
+        if self._dict is None:
+            self._dict = {
+                "type": "object",
+                "properties": self.properties,
+                "required": self.required
+            }
+        return {**self._dict, "required": list(self.required)}
+
+
+class ToolInterface:
+    """Interface that tools must implement."""
+
+    def get_definition(self) -> ToolDefinition:
+        raise NotImplementedError
+
+    def get_schema(self) -> ToolSchema:
+        raise NotImplementedError
+
+    async def execute(self, **kwargs) -> Dict[str, Any]:
+        raise NotImplementedError
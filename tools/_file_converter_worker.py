@@ -0,0 +1,102 @@
+"""
+File Converter Worker Helpers
+
+MarkItDown and OpenAI client setup shared by the file converter tool and its
+conversion pool worker processes. This is a plain module (no tool class), so
+worker processes can import it by name and unpickle _convert_in_worker.
+"""
+
+import io
+import inspect
+from functools import lru_cache
+from typing import Dict, Any, Optional
+
+try:
+    from markitdown import MarkItDown
+except ImportError:
+    MarkItDown = None
+
+
+def _probe_markitdown_kwargs() -> Optional[frozenset]:
+    """Get the keyword arguments the installed MarkItDown constructor accepts (None if any)."""
+    if MarkItDown is None:
+        return frozenset()
+    try:
+        # Skip ``self``
+        params = list(inspect.signature(MarkItDown.__init__).parameters.values())[1:]
+    except (TypeError, ValueError):
+        return None
+    if any(param.kind is param.VAR_KEYWORD for param in params):
+        return None
+    return frozenset(
+        param.name for param in params
+        if param.kind in (param.POSITIONAL_OR_KEYWORD, param.KEYWORD_ONLY)
+    )
+
+
+# Probed once per installed MarkItDown version instead of retrying constructor signatures
+_MARKITDOWN_KWARGS = _probe_markitdown_kwargs()
+
+
+def _create_markitdown(**candidate):
+    """Create a MarkItDown instance with the candidate arguments its constructor supports."""
+    if _MARKITDOWN_KWARGS is None:
+        return MarkItDown(**candidate)
+    return MarkItDown(**{key: value for key, value in candidate.items() if key in _MARKITDOWN_KWARGS})
+
+
+def _create_llm_markitdown(client, model: str):
+    """Create a MarkItDown instance that uses an OpenAI client for LLM features."""
+    markitdown = _create_markitdown(llm_client=client, llm_model=model, enable_plugins=True)
+    if _MARKITDOWN_KWARGS is not None and 'llm_client' not in _MARKITDOWN_KWARGS:
+        # The constructor does not take the client, so set it on the instance
+        markitdown.llm_client = client
+        markitdown.llm_model = model
+    return markitdown
+
+
+# Clients kept for distinct (API key, endpoint) pairs; older ones are dropped
+# rather than holding every key ever configured for the life of the process
+OPENAI_CLIENT_CACHE_SIZE = 8
+
+
+@lru_cache(maxsize=OPENAI_CLIENT_CACHE_SIZE)
+def _get_openai_client(api_key: str, base_url: Optional[str] = None):
+    """Get the OpenAI client for an API key and endpoint, shared by all converter instances.
+
+    A single client keeps one keep-alive connection pool, so reloading tools or OCR'ing
+    pages in parallel reuses connections instead of paying a new TLS handshake each time.
+    """
+    import httpx
+    from openai import OpenAI
+
+    client_kwargs = {
+        'api_key': api_key,
+        'http_client': httpx.Client(
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+            timeout=httpx.Timeout(120.0, connect=5.0)
+        )
+    }
+    if base_url:
+        client_kwargs['base_url'] = base_url
+    return OpenAI(**client_kwargs)
+
+
+# MarkItDown instances of conversion pool worker processes, by LLM settings
+_worker_markitdown: Dict[Any, Any] = {}
+
+
+def _convert_in_worker(file_content: bytes, ext: str, filename: str, llm_settings: Optional[tuple]) -> tuple:
+    """Convert a file in a conversion pool worker process, returning (markdown, title)."""
+    markitdown = _worker_markitdown.get(llm_settings)
+    if markitdown is None:
+        if llm_settings:
+            api_key, base_url, model = llm_settings
+            # A fresh client: a forked worker must not share the parent's connections
+            client = _get_openai_client.__wrapped__(api_key, base_url)
+            markitdown = _create_llm_markitdown(client, model)
+        else:
+            markitdown = _create_markitdown(enable_plugins=False)
+        _worker_markitdown[llm_settings] = markitdown
+    result = markitdown.convert_stream(io.BytesIO(file_content), file_extension=ext, filename=filename)
+    return result.markdown, result.title
@@ -6,70 +6,310 @@ It's completely self-contained with no imports from the core service.
 """
 
 import io
+import os
+import asyncio
+import logging
 import base64
-from typing import Dict, Any
+import binascii
+import hashlib
+import importlib.util
+import re
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, Any, Optional, AsyncIterator
 from pathlib import Path
 
+# Shared tool classes from _base.py next to this file, loaded by path under a
+# namespaced name and registered once in sys.modules, so that every tool shares
+# the same classes without the tools directory being put on sys.path
+_base = sys.modules.get("fastapi_mcp_tools._base")
+if _base is None:
+    _base_spec = importlib.util.spec_from_file_location("fastapi_mcp_tools._base", Path(__file__).with_name("_base.py"))
+    _base = importlib.util.module_from_spec(_base_spec)
+    _base_spec.loader.exec_module(_base)
+    # Tools load concurrently, so keep whichever copy was registered first
+    _base = sys.modules.setdefault(_base_spec.name, _base)
+ToolDefinition, ToolSchema, ToolInterface = _base.ToolDefinition, _base.ToolSchema, _base.ToolInterface
+
+# MarkItDown setup and the conversion pool entry point live in a plain module so
+# pool workers can unpickle _convert_in_worker by name: it is registered here
+# under its file name, and spawned workers load it the same way (_WORKER_BOOTSTRAP)
+_worker_spec = importlib.util.spec_from_file_location(
+    "_file_converter_worker", Path(__file__).with_name("_file_converter_worker.py")
+)
+_worker = importlib.util.module_from_spec(_worker_spec)
+sys.modules[_worker_spec.name] = _worker
+_worker_spec.loader.exec_module(_worker)
+MarkItDown = _worker.MarkItDown
+_create_markitdown, _create_llm_markitdown = _worker._create_markitdown, _worker._create_llm_markitdown
+_get_openai_client, _convert_in_worker = _worker._get_openai_client, _worker._convert_in_worker
+
 try:
-    from markitdown import MarkItDown
+    from charset_normalizer import from_bytes as detect_charset
 except ImportError:
-    MarkItDown = None
+    detect_charset = None
 
 
-class ToolDefinition:
-    """Definition structure for a tool."""
-    
-    def __init__(self, name: str, description: str, endpoint: str, tool_type: str, version: str = "1.0.0"):
-        self.name = name
-        self.description = description
-        self.endpoint = endpoint
-        self.tool_type = tool_type  # Now accepts any string
-        self.version = version
-    
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            "name": self.name,
-            "description": self.description,
-            "endpoint": self.endpoint,
-            "type": self.tool_type,  # Direct string value
-            "version": self.version
-        }
+# Static text part of the vision OCR prompt, shared by every page request
+OCR_PROMPT_PART = {
+    "type": "text",
+    "text": "Please extract all text from this image. Return only the text content, maintaining the original structure and formatting as much as possible. If there are multiple columns, preserve the reading order."
+}
+
+# Prompt for several page images sent to the vision model in one request; the
+# numbered markers let the response be split back into per-page text
+OCR_BATCH_PROMPT_PART = {
+    "type": "text",
+    "text": "Please extract all text from each of the following images, which are consecutive pages of one document. Before the text of each image, write a line containing only ===PAGE n===, where n is the image's position in this message (1 for the first image). Return only the text content, maintaining the original structure and formatting as much as possible. If there are multiple columns, preserve the reading order."
+}
+OCR_PAGE_MARKER = re.compile(r"^===PAGE (\d+)===[ \t]*$", re.MULTILINE)
+
+# Completion token budget per OCR'd page (scaled with the rendered page area)
+OCR_MIN_TOKENS = 1500
+OCR_MAX_TOKENS = 4000
+
+# Inputs that are already plain text or Markdown and need no conversion
+TEXT_EXTENSIONS = frozenset({'.md', '.markdown', '.txt'})
+TEXT_CONTENT_TYPES = frozenset({'text/plain', 'text/markdown'})
+
+# Largest file accepted for conversion unless max_file_bytes is configured
+DEFAULT_MAX_FILE_BYTES = 50 * 1024 * 1024
+
+# Entries kept in each of the converter's result caches (whole files and OCR'd pages)
+CACHE_MAX_ENTRIES = 128
+
+# Markdown characters held by the conversion cache in total, and the largest
+# single result it keeps
+CACHE_MAX_CHARS = 256 * 1024 * 1024
+CACHE_MAX_ITEM_CHARS = 32 * 1024 * 1024
+
+# Characters per chunk when the Markdown is streamed
+STREAM_CHUNK_CHARS = 64 * 1024
+
+# Arguments ignored on the items of a batch conversion
+BATCH_ITEM_EXCLUDED = frozenset({"files", "stream"})
+
+
+def _conversion_workers(config: Dict[str, Any]) -> int:
+    """Get the configured conversion pool size (0 for threads; negative means the CPU count)."""
+    workers = int(config.get('conversion_workers', 0) or 0)
+    if workers < 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+# Run by each conversion pool worker through exec (a builtin, so the initializer
+# pickles by name): loads the worker module from its file unless a forked worker
+# already has it, without putting the tools directory on sys.path
+_WORKER_BOOTSTRAP = f"""
+import importlib.util, sys
+if {_worker_spec.name!r} not in sys.modules:
+    spec = importlib.util.spec_from_file_location({_worker_spec.name!r}, {_worker_spec.origin!r})
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+"""
+
+
+async def _iter_chunks(text: str) -> AsyncIterator[str]:
+    """Yield text in slices of STREAM_CHUNK_CHARS characters."""
+    for start in range(0, len(text), STREAM_CHUNK_CHARS):
+        yield text[start:start + STREAM_CHUNK_CHARS]
 
 
-class ToolSchema:
-    """Schema definition for tool parameters."""
+def _decode_text(data: bytes, charset: Optional[str] = None) -> str:
+    """Decode a text file in its declared charset, or detect the encoding when it is not UTF-8."""
+    for encoding in (charset, 'utf-8-sig'):
+        if encoding:
+            try:
+                return data.decode(encoding)
+            except (LookupError, UnicodeDecodeError):
+                pass
+    if detect_charset is not None:
+        best = detect_charset(data).best()
+        if best is not None:
+            return str(best)
+    return data.decode('utf-8', errors='replace')
+
+
+def _base64_decoded_size(data) -> int:
+    """Estimate the decoded size of base64 text (str or bytes) without decoding or copying it."""
+    if isinstance(data, str):
+        whitespace, pad = ' \t\r\n', '='
+    else:
+        whitespace, pad = b' \t\r\n', b'='
+    # Whitespace (e.g. MIME line breaks) carries no data; counting it is done in C
+    length = len(data) - sum(data.count(whitespace[i:i + 1]) for i in range(len(whitespace)))
+    padding = data[-64:].rstrip(whitespace)[-2:].count(pad)
+    return max((length // 4) * 3 - padding, 0)
+
+
+def _stream_size(stream) -> int:
+    """Get the size of a file object without reading it, leaving it rewound."""
+    size = stream.seek(0, io.SEEK_END)
+    stream.seek(0)
+    return size
+
+
+def _hash_stream(stream) -> tuple:
+    """Get the sha256 hex digest, size and first bytes of a file object, leaving it rewound."""
+    digest = hashlib.sha256()
+    stream.seek(0)
+    head = chunk = stream.read(1 << 20)
+    while chunk:
+        digest.update(chunk)
+        chunk = stream.read(1 << 20)
+    size = stream.tell()
+    stream.seek(0)
+    return digest.hexdigest(), size, head[:8]
+
+
+def _read_stream(stream) -> bytes:
+    """Read a whole file object, leaving it rewound."""
+    stream.seek(0)
+    data = stream.read()
+    stream.seek(0)
+    return data
+
+
+_easyocr_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _get_easyocr_reader():
+    """Get the shared EasyOCR reader (English), loading its models on first use."""
+    import easyocr
+    return easyocr.Reader(['en'])
+
+
+def _image_part(img_data: bytes) -> Dict[str, Any]:
+    """Build a chat message part carrying a JPEG page image as a data URL."""
+    # Base64 straight into an ASCII data URL
+    image_url = "data:image/jpeg;base64," + base64.b64encode(img_data).decode('ascii')
+    return {"type": "image_url", "image_url": {"url": image_url}}
+
+
+def _pdf_has_text(pdf_content: bytes) -> Optional[bool]:
+    """Check whether any page of a PDF has a text layer (None if it cannot be checked).
     
-    def __init__(self, properties: Dict[str, Any], required: list = None):
-        self.properties = properties
-        self.required = required or []
+    Stops at the first page with text, so text PDFs are decided on page one.
+    """
+    try:
+        import fitz  # PyMuPDF
+    except ImportError:
+        return None
     
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            "type": "object",
-            "properties": self.properties,
-            "required": self.required
-        }
+    try:
+        pdf_doc = fitz.open(stream=pdf_content, filetype="pdf")
+    except Exception:
+        return None
+    try:
+        return any(page.get_text("text").strip() for page in pdf_doc)
+    finally:
+        pdf_doc.close()
 
 
-class ToolInterface:
-    """Interface that tools must implement."""
+def _render_pdf_pages(pdf_content: bytes, max_pages: int, zoom: float = 1.5):
+    """Render the first max_pages pages of a PDF to images for OCR.
     
-    def get_definition(self) -> ToolDefinition:
-        raise NotImplementedError
+    Returns the document's page count and a list of
+    (page number, image bytes, max completion tokens) tuples.
+    """
+    import fitz  # PyMuPDF
     
-    def get_schema(self) -> ToolSchema:
-        raise NotImplementedError
-    
-    async def execute(self, **kwargs) -> Dict[str, Any]:
-        raise NotImplementedError
+    pdf_doc = fitz.open(stream=pdf_content, filetype="pdf")
+    try:
+        pages = []
+        mat = fitz.Matrix(zoom, zoom)  # 1.5x zoom (~108 DPI) is plenty for vision models
+        # Process first few pages (limit to avoid excessive processing)
+        for page_num in range(min(max_pages, pdf_doc.page_count)):
+            # Grayscale JPEG is several times smaller than a color PNG and loses
+            # nothing for OCR, which cuts upload size and vision token usage
+            pix = pdf_doc[page_num].get_pixmap(matrix=mat, colorspace=fitz.csGRAY)
+            # Scale the completion budget with the page area instead of always
+            # reserving the maximum
+            max_tokens = min(OCR_MAX_TOKENS, max(OCR_MIN_TOKENS, pix.width * pix.height // 2500))
+            pages.append((page_num + 1, pix.tobytes("jpg", jpg_quality=80), max_tokens))
+            # Release the raw pixel buffer now rather than when the next page is rendered
+            del pix
+        return pdf_doc.page_count, pages
+    finally:
+        pdf_doc.close()
 
 
 class FileToMarkdownConverter(ToolInterface):
     """Converts various file formats to Markdown."""
     
+    # Tool metadata is static, so it is built once and shared by every call
+    _DEFINITION = ToolDefinition(
+        name="file_to_markdown",
+        description="Convert various file formats (PDF, DOCX, images, etc.) to Markdown",
+        endpoint="/convert",
+        tool_type="converter",  # Direct string instead of enum
+        version="1.0.0"
+    )
+    
+    _SCHEMA = ToolSchema(
+        properties={
+            "file_content": {
+                "type": "string",
+                "format": "binary",
+                "description": "File content as bytes"
+            },
+            "filename": {
+                "type": "string",
+                "description": "Original filename with extension"
+            },
+            "content_type": {
+                "type": "string",
+                "description": "MIME type of the file"
+            },
+            "base64_content": {
+                "type": "string",
+                "description": "Base64 encoded file content (alternative to file_content)"
+            },
+            "files": {
+                "type": "array",
+                "description": "Several files to convert concurrently (alternative to a single file)",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "filename": {"type": "string"},
+                        "base64_content": {"type": "string"},
+                        "content_type": {"type": "string"}
+                    },
+                    "required": ["filename"]
+                }
+            },
+            "stream": {
+                "type": "boolean",
+                "default": False,
+                "description": "Stream the Markdown as text instead of returning a result object"
+            }
+        },
+        # filename is checked in execute(), as batch calls pass it per file
+        required=[]
+    )
+    
+    # Take REST uploads as a spooled file object rather than bytes in memory
+    accepts_file_stream = True
+    
     def __init__(self, tool_base):
         self.tool_base = tool_base
         self.markitdown = None
+        # LRU caches: sha256(file) + extension + content type -> response, sha256(page image) -> page text
+        self._conversion_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._conversion_cache_chars = 0
+        self._page_cache: "OrderedDict[bytes, str]" = OrderedDict()
+        logger = getattr(tool_base, 'logger', None)
+        self._debug = bool(logger) and logger.isEnabledFor(logging.DEBUG)
+        # LLM settings for recreating this MarkItDown setup in conversion pool workers
+        self._worker_llm_settings: Optional[tuple] = None
+        # Worker processes for MarkItDown parsing, started on first use (conversion_workers)
+        self._conversion_pool: Optional[ProcessPoolExecutor] = None
         if MarkItDown:
             self._initialize_markitdown()
 
@@ -79,7 +319,7 @@ class FileToMarkdownConverter(ToolInterface):
             # Get configuration from tool_base if available
             config = getattr(self.tool_base, 'config', {}) if self.tool_base else {}
             
-            if self.tool_base and hasattr(self.tool_base, 'log_info'):
+            if self._debug:
                 self.tool_base.log_info(f"Config keys available: {list(config.keys()) if isinstance(config, dict) else 'None'}")
             
             # Check if LLM features are enabled
@@ -89,7 +329,7 @@ class FileToMarkdownConverter(ToolInterface):
             openai_model = config.get('openai_model', 'gpt-4o')
             
             # Log configuration values
-            if self.tool_base and hasattr(self.tool_base, 'log_info'):
+            if self._debug:
                 self.tool_base.log_info(f"LLM enabled: {enable_llm}")
                 self.tool_base.log_info(f"OpenAI API key present: {bool(openai_api_key)}")
                 self.tool_base.log_info(f"OpenAI base URL: {openai_base_url}")
@@ -97,77 +337,33 @@ class FileToMarkdownConverter(ToolInterface):
             
             if enable_llm and openai_api_key:
                 try:
-                    from openai import OpenAI
-                    
-                    # Initialize OpenAI client
-                    client_kwargs = {'api_key': openai_api_key}
-                    if openai_base_url:
-                        client_kwargs['base_url'] = openai_base_url
-                    
-                    client = OpenAI(**client_kwargs)
+                    # Shared OpenAI client (one connection pool per endpoint and key)
+                    client = _get_openai_client(openai_api_key, openai_base_url)
                     
                     # Initialize MarkItDown with LLM support
-                    try:
-                        self.markitdown = MarkItDown(
-                            llm_client=client,
-                            llm_model=openai_model,
-                            enable_plugins=True
-                        )
-                        if self.tool_base:
-                            self.tool_base.log_info("MarkItDown initialized with LLM support")
-                    except TypeError as e:
-                        # Try alternative initialization approaches
-                        if self.tool_base:
-                            self.tool_base.log_warning(f"Direct LLM initialization failed: {e}")
-                        
-                        try:
-                            self.markitdown = MarkItDown(
-                                enable_plugins=True,
-                                **{'llm_client': client, 'llm_model': openai_model}
-                            )
-                            if self.tool_base:
-                                self.tool_base.log_info("MarkItDown initialized with LLM support (kwargs)")
-                        except Exception as e:
-                            if self.tool_base:
-                                self.tool_base.log_warning(f"Kwargs initialization failed: {e}")
-                            
-                            # Fallback: create instance then set attributes
-                            self.markitdown = MarkItDown(enable_plugins=True)
-                            try:
-                                self.markitdown.llm_client = client
-                                self.markitdown.llm_model = openai_model
-                                if self.tool_base:
-                                    self.tool_base.log_info("LLM client set on MarkItDown instance")
-                            except Exception as e:
-                                try:
-                                    self.markitdown._llm_client = client
-                                    self.markitdown._llm_model = openai_model
-                                    if self.tool_base:
-                                        self.tool_base.log_info("LLM client set as private attributes")
-                                except Exception as e:
-                                    if self.tool_base:
-                                        self.tool_base.log_warning(f"Failed to set LLM client: {e}")
+                    self.markitdown = _create_llm_markitdown(client, openai_model)
+                    self._worker_llm_settings = (openai_api_key, openai_base_url, openai_model)
                     
                     if self.tool_base:
                         self.tool_base.log_info(f"MarkItDown initialized with OpenAI model: {openai_model}")
                     
                 except ImportError:
                     # OpenAI not available, fall back to basic MarkItDown
-                    self.markitdown = MarkItDown(enable_plugins=False)
+                    self.markitdown = _create_markitdown(enable_plugins=False)
                     if self.tool_base and hasattr(self.tool_base, 'log_warning'):
                         self.tool_base.log_warning("OpenAI library not available, using basic MarkItDown")
                 except Exception as e:
                     # Error with OpenAI setup, fall back to basic MarkItDown
-                    self.markitdown = MarkItDown(enable_plugins=False)
+                    self.markitdown = _create_markitdown(enable_plugins=False)
                     if self.tool_base and hasattr(self.tool_base, 'log_warning'):
                         self.tool_base.log_warning(f"OpenAI setup failed, using basic MarkItDown: {e}")
             else:
                 # Use basic MarkItDown without LLM features
-                self.markitdown = MarkItDown(enable_plugins=False)
+                self.markitdown = _create_markitdown(enable_plugins=False)
                 
         except Exception as e:
             # Fallback to basic MarkItDown
-            self.markitdown = MarkItDown(enable_plugins=False)
+            self.markitdown = _create_markitdown(enable_plugins=False)
             if self.tool_base and hasattr(self.tool_base, 'log_error'):
                 self.tool_base.log_error(f"Error initializing MarkItDown: {e}")
 
@@ -181,55 +377,49 @@ class FileToMarkdownConverter(ToolInterface):
         try:
             # Try to import required libraries for PDF to image conversion
             try:
-                import fitz  # PyMuPDF
+                import fitz  # noqa: F401 - PyMuPDF, used by _render_pdf_pages
             except ImportError:
                 self.tool_base.log_error("PyMuPDF not available - cannot convert PDF to images for OCR")
                 return ""
             
             self.tool_base.log_info("Converting PDF pages to images for enhanced OCR...")
             
-            # Open PDF with PyMuPDF
-            pdf_doc = fitz.open(stream=pdf_content, filetype="pdf")
-            extracted_text = []
+            config = getattr(self.tool_base, 'config', {}) or {}
             
-            # Process first few pages (limit to avoid excessive processing)
-            max_pages = min(5, pdf_doc.page_count)
-            self.tool_base.log_info(f"Processing {max_pages} pages out of {pdf_doc.page_count} total pages")
+            # Stage 1: render the pages up front, off the event loop (rendering is
+            # CPU-bound, and a PyMuPDF document must stay on one thread)
+            page_count, pages = await asyncio.to_thread(
+                _render_pdf_pages, pdf_content, 5, float(config.get('ocr_zoom', 1.5))
+            )
+            self.tool_base.log_info(f"Processing {len(pages)} pages out of {page_count} total pages")
             
-            for page_num in range(max_pages):
-                page = pdf_doc[page_num]
-                
-                # Convert page to image
-                mat = fitz.Matrix(2.0, 2.0)  # 2x zoom for better quality
-                pix = page.get_pixmap(matrix=mat)
-                img_data = pix.tobytes("png")
-                
-                self.tool_base.log_info(f"Processing page {page_num + 1}...")
-                
-                # Level 1: Try traditional OCR first (fast and free)
-                ocr_text = await self._extract_text_with_ocr(img_data, page_num + 1)
-                
-                if ocr_text and len(ocr_text.strip()) > 50:  # Good OCR result
-                    extracted_text.append(f"# Page {page_num + 1}\n\n{ocr_text.strip()}\n\n")
-                    self.tool_base.log_info(f"Successfully extracted {len(ocr_text)} characters from page {page_num + 1} using OCR")
-                    continue
-                
-                # Level 2: Fall back to LLM vision analysis
-                self.tool_base.log_info(f"OCR yield insufficient, trying LLM vision analysis for page {page_num + 1}")
-                llm_text = await self._extract_text_with_llm(img_data, llm_client, page_num + 1)
-                
-                if llm_text and llm_text.strip():
-                    extracted_text.append(f"# Page {page_num + 1}\n\n{llm_text.strip()}\n\n")
-                    self.tool_base.log_info(f"Extracted {len(llm_text)} characters from page {page_num + 1} using LLM")
+            # Stage 2: pages that are cached or read well by traditional OCR are done
+            # without the vision model; concurrency is bounded so that a large PDF
+            # does not flood the OCR engine or the vision endpoint
+            semaphore = asyncio.Semaphore(max(1, int(config.get('ocr_concurrency', 8))))
+            local_results = await asyncio.gather(*(
+                self._ocr_page_locally(img_data, page_number, semaphore)
+                for page_number, img_data, _ in pages
+            ))
+            page_texts = {}
+            llm_pages = []
+            for (page_number, img_data, max_tokens), (page_key, text, ocr_text) in zip(pages, local_results):
+                if text:
+                    page_texts[page_number] = text
                 else:
-                    # Level 3: Combination approach (if both methods found something)
-                    if ocr_text and ocr_text.strip():
-                        combined_text = await self._combine_ocr_and_llm(ocr_text, llm_text, page_num + 1)
-                        extracted_text.append(f"# Page {page_num + 1}\n\n{combined_text}\n\n")
-                    else:
-                        self.tool_base.log_warning(f"No text could be extracted from page {page_num + 1}")
+                    llm_pages.append((page_number, img_data, max_tokens, page_key, ocr_text))
             
-            pdf_doc.close()
+            # Stage 3: the remaining pages go to the vision model, several per request
+            batch_size = max(1, int(config.get('ocr_batch_pages', 3)))
+            batches = [llm_pages[i:i + batch_size] for i in range(0, len(llm_pages), batch_size)]
+            for batch_texts in await asyncio.gather(*(
+                self._ocr_batch_with_llm(batch, llm_client, semaphore) for batch in batches
+            )):
+                page_texts.update(batch_texts)
+            extracted_text = [
+                f"# Page {page_number}\n\n{page_texts[page_number]}\n\n"
+                for page_number, _, _ in pages if page_texts.get(page_number)
+            ]
             
             # Combine all extracted text
             full_text = "\n".join(extracted_text)
@@ -241,14 +431,103 @@ class FileToMarkdownConverter(ToolInterface):
             self.tool_base.log_error(f"Enhanced OCR failed: {e}")
             return ""
     
-    async def _extract_text_with_ocr(self, img_data: bytes, page_num: int) -> str:
-        """Extract text using traditional OCR (pytesseract or easyocr)."""
+    async def _ocr_page_locally(self, img_data: bytes, page_num: int,
+                                semaphore: asyncio.Semaphore) -> tuple:
+        """Get a page's text from the cache or traditional OCR.
+        
+        Returns the page's cache key, its final text ("" if the vision model is
+        still needed) and the raw traditional OCR text.
+        """
+        # Identical page images (repeated uploads, shared cover pages) are OCR'd once
+        page_key = hashlib.sha256(img_data).digest()
+        text = self._cache_get(self._page_cache, page_key)
+        if text is not None:
+            return page_key, text, None
+        
+        self.tool_base.log_info(f"Processing page {page_num}...")
+        
+        # Level 1: Try traditional OCR first (fast and free)
+        async with semaphore:
+            # Tesseract and EasyOCR block, so pages are OCR'd in worker threads
+            ocr_text = await asyncio.to_thread(self._extract_text_with_ocr, img_data, page_num)
+        
+        if ocr_text and len(ocr_text.strip()) > 50:  # Good OCR result
+            self.tool_base.log_info(f"Successfully extracted {len(ocr_text)} characters from page {page_num} using OCR")
+            text = ocr_text.strip()
+            self._cache_put(self._page_cache, page_key, text)
+            return page_key, text, ocr_text
+        
+        self.tool_base.log_info(f"OCR yield insufficient, trying LLM vision analysis for page {page_num}")
+        return page_key, "", ocr_text
+    
+    async def _ocr_batch_with_llm(self, batch: list, llm_client,
+                                  semaphore: asyncio.Semaphore) -> Dict[int, str]:
+        """Run the LLM fallback on a batch of pages, returning page number -> text."""
+        # Level 2: Fall back to LLM vision analysis
+        async with semaphore:
+            llm_texts = None
+            if len(batch) > 1:
+                llm_texts = await self._extract_batch_with_llm(batch, llm_client)
+            if llm_texts is None:
+                # Single page, or a response that could not be split into pages
+                llm_texts = [
+                    await self._extract_text_with_llm(img_data, llm_client, page_number, max_tokens)
+                    for page_number, img_data, max_tokens, _, _ in batch
+                ]
+        
+        texts = {}
+        for (page_number, _, _, page_key, ocr_text), llm_text in zip(batch, llm_texts):
+            if llm_text and llm_text.strip():
+                self.tool_base.log_info(f"Extracted {len(llm_text)} characters from page {page_number} using LLM")
+                text = llm_text.strip()
+            elif ocr_text and ocr_text.strip():
+                # Level 3: Combination approach (if both methods found something)
+                text = await self._combine_ocr_and_llm(ocr_text, llm_text, page_number)
+            else:
+                self.tool_base.log_warning(f"No text could be extracted from page {page_number}")
+                continue
+            self._cache_put(self._page_cache, page_key, text)
+            texts[page_number] = text
+        return texts
+    
+    @staticmethod
+    def _cache_get(cache: "OrderedDict[Any, Any]", key: Any) -> Any:
+        """Look up a cache entry, marking it as recently used."""
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+    
+    @staticmethod
+    def _cache_put(cache: "OrderedDict[Any, Any]", key: Any, value: Any) -> None:
+        """Store a cache entry, evicting the least recently used beyond the size limit."""
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > CACHE_MAX_ENTRIES:
+            cache.popitem(last=False)
+    
+    def _cache_conversion(self, cache_key: str, response: Dict[str, Any]) -> None:
+        """Cache a conversion response, keeping the cached Markdown within its size budget."""
+        chars = len(response.get("markdown") or "")
+        if chars > CACHE_MAX_ITEM_CHARS:
+            return
+        cache = self._conversion_cache
+        previous = cache.pop(cache_key, None)
+        if previous is not None:
+            self._conversion_cache_chars -= len(previous.get("markdown") or "")
+        cache[cache_key] = response
+        self._conversion_cache_chars += chars
+        while len(cache) > CACHE_MAX_ENTRIES or self._conversion_cache_chars > CACHE_MAX_CHARS:
+            _, evicted = cache.popitem(last=False)
+            self._conversion_cache_chars -= len(evicted.get("markdown") or "")
+    
+    def _extract_text_with_ocr(self, img_data: bytes, page_num: int) -> str:
+        """Extract text using traditional OCR (pytesseract or easyocr); blocking."""
         try:
             # Try pytesseract first (most common)
             try:
                 import pytesseract
                 from PIL import Image
-                import io
                 
                 # Convert image data to PIL Image
                 image = Image.open(io.BytesIO(img_data))
@@ -266,14 +545,15 @@ class FileToMarkdownConverter(ToolInterface):
                     import easyocr
                     import numpy as np
                     from PIL import Image
-                    import io
                     
                     # Convert image to numpy array
                     image = Image.open(io.BytesIO(img_data))
                     img_array = np.array(image)
                     
-                    # Initialize EasyOCR reader (English by default)
-                    reader = easyocr.Reader(['en'])
+                    # The reader loads its models once; the lock keeps concurrent
+                    # first pages from loading them twice
+                    with _easyocr_lock:
+                        reader = _get_easyocr_reader()
                     
                     # Extract text
                     results = reader.readtext(img_array)
@@ -291,34 +571,58 @@ class FileToMarkdownConverter(ToolInterface):
             self.tool_base.log_error(f"Traditional OCR failed for page {page_num}: {e}")
             return ""
     
-    async def _extract_text_with_llm(self, img_data: bytes, llm_client, page_num: int) -> str:
-        """Extract text using LLM vision analysis."""
+    async def _extract_batch_with_llm(self, batch: list, llm_client) -> Optional[list]:
+        """Extract the text of several pages with one LLM vision request.
+        
+        Returns the text per page in batch order, or None if the response
+        does not mark every page.
+        """
+        first_page = batch[0][0]
         try:
-            # Convert to base64 for LLM
-            import base64
-            img_base64 = base64.b64encode(img_data).decode()
-            
-            # Use LLM to extract text from image
-            response = llm_client.chat.completions.create(
+            response = await asyncio.to_thread(
+                llm_client.chat.completions.create,
                 model=getattr(self.markitdown, '_llm_model', 'gpt-4o'),
                 messages=[
                     {
                         "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": "Please extract all text from this image. Return only the text content, maintaining the original structure and formatting as much as possible. If there are multiple columns, preserve the reading order."
-                            },
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/png;base64,{img_base64}"
-                                }
-                            }
+                        "content": [OCR_BATCH_PROMPT_PART] + [
+                            _image_part(img_data) for _, img_data, _, _, _ in batch
                         ]
                     }
                 ],
-                max_tokens=4000
+                max_tokens=sum(max_tokens for _, _, max_tokens, _, _ in batch)
+            )
+            
+            # re.split yields [preamble, position, text, position, text, ...]
+            parts = OCR_PAGE_MARKER.split(response.choices[0].message.content or "")
+            texts = {int(position): text for position, text in zip(parts[1::2], parts[2::2])}
+            if not all(position in texts for position in range(1, len(batch) + 1)):
+                self.tool_base.log_warning(
+                    f"LLM response for pages {first_page}-{batch[-1][0]} is missing page markers, retrying per page"
+                )
+                return None
+            return [texts[position] for position in range(1, len(batch) + 1)]
+            
+        except Exception as e:
+            self.tool_base.log_error(f"LLM vision analysis failed for pages {first_page}-{batch[-1][0]}: {e}")
+            return None
+    
+    async def _extract_text_with_llm(self, img_data: bytes, llm_client, page_num: int,
+                                     max_tokens: int = OCR_MAX_TOKENS) -> str:
+        """Extract text using LLM vision analysis."""
+        try:
+            # Use LLM to extract text from image (the client is synchronous, so the
+            # request runs in a worker thread to let other pages proceed)
+            response = await asyncio.to_thread(
+                llm_client.chat.completions.create,
+                model=getattr(self.markitdown, '_llm_model', 'gpt-4o'),
+                messages=[
+                    {
+                        "role": "user",
+                        "content": [OCR_PROMPT_PART, _image_part(img_data)]
+                    }
+                ],
+                max_tokens=max_tokens
             )
             
             text = response.choices[0].message.content
@@ -349,43 +653,43 @@ class FileToMarkdownConverter(ToolInterface):
             self.tool_base.log_error(f"Failed to combine OCR and LLM results for page {page_num}: {e}")
             return ocr_text or llm_text or ""
 
+    def _get_conversion_pool(self, max_workers: int) -> ProcessPoolExecutor:
+        """Get the conversion process pool, starting it on first use."""
+        if self._conversion_pool is None:
+            self._conversion_pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=exec,
+                initargs=(_WORKER_BOOTSTRAP, {})
+            )
+        return self._conversion_pool
+    
+    def close(self) -> None:
+        """Shut down the conversion worker processes, if any were started."""
+        if self._conversion_pool is not None:
+            self._conversion_pool.shutdown(wait=False, cancel_futures=True)
+            self._conversion_pool = None
+    
     def get_definition(self) -> ToolDefinition:
-        return ToolDefinition(
-            name="file_to_markdown",
-            description="Convert various file formats (PDF, DOCX, images, etc.) to Markdown",
-            endpoint="/convert",
-            tool_type="converter",  # Direct string instead of enum
-            version="1.0.0"
-        )
+        return self._DEFINITION
     
     def get_schema(self) -> ToolSchema:
-        return ToolSchema(
-            properties={
-                "file_content": {
-                    "type": "string",
-                    "format": "binary",
-                    "description": "File content as bytes"
-                },
-                "filename": {
-                    "type": "string",
-                    "description": "Original filename with extension"
-                },
-                "content_type": {
-                    "type": "string",
-                    "description": "MIME type of the file"
-                },
-                "base64_content": {
-                    "type": "string",
-                    "description": "Base64 encoded file content (alternative to file_content)"
-                }
-            },
-            required=["filename"]
-        )
+        return self._SCHEMA
     
     async def execute(self, **kwargs) -> Dict[str, Any]:
         """Convert file to markdown."""
+        if kwargs.pop("stream", False):
+            # Hand the Markdown to the routes as chunks, which they write out as they
+            # go instead of serializing one large response (failures stay results)
+            response = await self.execute(**kwargs)
+            if not response.get("success") or "markdown" not in response:
+                return response
+            return _iter_chunks(response["markdown"] or "")
+        
+        # Diagnostics are only built when the logger would actually emit debug output
+        debug = self._debug
+        
         # Debug incoming parameters
-        if self.tool_base:
+        if debug:
             self.tool_base.log_info(f"Execute called with parameters: {list(kwargs.keys())}")
             self.tool_base.log_info(f"Filename: {kwargs.get('filename')}")
             self.tool_base.log_info(f"Has file_content: {bool(kwargs.get('file_content'))}")
@@ -393,11 +697,9 @@ class FileToMarkdownConverter(ToolInterface):
             if kwargs.get('base64_content'):
                 self.tool_base.log_info(f"Base64 content length: {len(kwargs.get('base64_content'))}")
         
-        if not self.markitdown:
-            return {
-                "success": False,
-                "error": "MarkItDown library not available"
-            }
+        files = kwargs.get("files")
+        if files is not None:
+            return await self._execute_batch(files)
         
         filename = kwargs.get("filename")
         if not filename:
@@ -405,41 +707,63 @@ class FileToMarkdownConverter(ToolInterface):
                 "success": False,
                 "error": "filename is required"
             }
-          # Get file content
+        # String split rather than a Path object; dotfiles have no extension, as with Path.suffix
+        ext = os.path.splitext(filename)[1].lower()
+        
+        # Get file content
         file_content = kwargs.get("file_content")
         base64_content = kwargs.get("base64_content")
         
+        # Reject oversize input before decoding or copying any of it
+        config = getattr(self.tool_base, 'config', {}) or {}
+        max_file_bytes = int(config.get('max_file_bytes', DEFAULT_MAX_FILE_BYTES))
+        if base64_content:
+            input_size = _base64_decoded_size(base64_content)
+        elif file_content:
+            input_size = len(file_content)
+        elif kwargs.get("file_stream") is not None:
+            input_size = await asyncio.to_thread(_stream_size, kwargs["file_stream"])
+        else:
+            input_size = 0
+        if input_size > max_file_bytes:
+            if self.tool_base:
+                self.tool_base.log_warning(f"Rejected {filename}: {input_size} bytes exceeds the {max_file_bytes} byte limit")
+            return {
+                "success": False,
+                "error": f"File too large: {input_size} bytes (limit {max_file_bytes})"
+            }
+        
         if base64_content:
             try:
-                # Clean up base64 content - remove whitespace and fix padding if needed
-                base64_clean = base64_content.strip().replace('\n', '').replace('\r', '').replace(' ', '')
+                base64_raw = base64_content.encode('ascii', 'ignore') if isinstance(base64_content, str) else base64_content
                 
-                # Fix padding if necessary
-                missing_padding = len(base64_clean) % 4
-                if missing_padding:
-                    base64_clean += '=' * (4 - missing_padding)
-                
-                if self.tool_base:
+                if debug:
                     self.tool_base.log_info(f"Original base64 length: {len(base64_content)}")
-                    self.tool_base.log_info(f"Cleaned base64 length: {len(base64_clean)}")
-                    self.tool_base.log_info(f"Base64 starts with: {base64_clean[:20]}...")
-                    self.tool_base.log_info(f"Base64 ends with: ...{base64_clean[-20:]}")
+                    self.tool_base.log_info(f"Base64 starts with: {base64_raw[:20]}...")
+                    self.tool_base.log_info(f"Base64 ends with: ...{base64_raw[-20:]}")
                 
-                file_content = base64.b64decode(base64_clean)
+                # The non-validating decoder skips whitespace and other stray characters
+                # in C, so no cleaned-up copy of the payload is built
+                try:
+                    file_content = base64.b64decode(base64_raw, validate=False)
+                except binascii.Error:
+                    # Unpadded input; surplus padding is ignored, so "==" covers every
+                    # length at the cost of one copy in this uncommon case
+                    file_content = base64.b64decode(base64_raw + b'==', validate=False)
+                
+                # The estimate above can be low for payloads with stray characters
+                if len(file_content) > max_file_bytes:
+                    if self.tool_base:
+                        self.tool_base.log_warning(f"Rejected {filename}: {len(file_content)} bytes exceeds the {max_file_bytes} byte limit")
+                    return {
+                        "success": False,
+                        "error": f"File too large: {len(file_content)} bytes (limit {max_file_bytes})"
+                    }
                 
                 # Debug the decoded content
-                if self.tool_base:
+                if debug:
                     self.tool_base.log_info(f"Base64 decoded successfully, content length: {len(file_content)}")
-                    # Check if it looks like a PDF by examining the header
-                    if len(file_content) >= 8:
-                        header = file_content[:8]
-                        self.tool_base.log_info(f"File header bytes: {header}")
-                        self.tool_base.log_info(f"File header as string: {header.decode('latin-1', errors='ignore')}")
-                        # PDF files should start with %PDF
-                        if header.startswith(b'%PDF'):
-                            self.tool_base.log_info("File appears to be a valid PDF based on header")
-                        else:
-                            self.tool_base.log_warning("File does not appear to be a PDF - missing %PDF header")
+                    self.tool_base.log_info(f"File header bytes: {file_content[:8]}")
             except Exception as e:
                 if self.tool_base:
                     self.tool_base.log_error(f"Base64 decode error: {str(e)}")
@@ -448,162 +772,130 @@ class FileToMarkdownConverter(ToolInterface):
                     "error": f"Invalid base64 content: {str(e)}"
                 }
         
-        if not file_content:
+        # Uploads through the REST API arrive as a (disk-spooled) file object
+        upload_stream = None if file_content else kwargs.get("file_stream")
+        
+        if not file_content and upload_stream is None:
             return {
                 "success": False,
                 "error": "No file content provided"
             }
         
         try:
-            # Create a BytesIO object from the content
-            if isinstance(file_content, str):
-                file_content = file_content.encode('utf-8')
+            if upload_stream is not None:
+                # Hash the upload in chunks instead of reading it into memory
+                digest, size, head = await asyncio.to_thread(_hash_stream, upload_stream)
+                file_stream = upload_stream
+            else:
+                # Text content passed as a JSON string
+                if isinstance(file_content, str):
+                    file_content = file_content.encode('utf-8')
+                digest, size, head = hashlib.sha256(file_content).hexdigest(), len(file_content), file_content[:8]
+                # BytesIO shares the bytes object's buffer until written to, so this does not copy
+                file_stream = io.BytesIO(file_content)
             
-            file_stream = io.BytesIO(file_content)
-              # Debug file stream
-            if self.tool_base:
-                self.tool_base.log_info(f"File stream created, size: {len(file_content)} bytes")
-                self.tool_base.log_info(f"File extension: {Path(filename).suffix.lower()}")
+            # The declared type decides whether the file is decoded as text, and in which
+            # charset, so it is part of the key along with the file bytes and extension
+            media_type, _, parameters = (kwargs.get("content_type") or "").partition(";")
+            media_type = media_type.strip().lower()
+            charset = parameters.partition("charset=")[2].split(";", 1)[0].strip().strip('"') or None
             
-            # Convert using MarkItDown
-            if self.tool_base:
+            # Identical file bytes convert to identical Markdown, so repeats skip the work
+            cache_key = f"{digest}{ext};{media_type};{(charset or '').lower()}"
+            cached = self._cache_get(self._conversion_cache, cache_key)
+            if cached is not None:
+                if self.tool_base:
+                    self.tool_base.log_info(f"Returning cached conversion for {filename}")
+                    self.tool_base.record_metric("conversion.cache_hit", 1)
+                return {**cached, "filename": filename, "content_type": kwargs.get("content_type"), "cached": True}
+            
+            # Check for LLM client in multiple possible locations
+            llm_client = getattr(self.markitdown, 'llm_client', None) or getattr(self.markitdown, '_llm_client', None)
+            
+            if debug:
+                self.tool_base.log_info(f"File stream created, size: {size} bytes")
+                self.tool_base.log_info(f"File extension: {ext}")
                 self.tool_base.log_info("Starting MarkItDown conversion...")
                 self.tool_base.log_info(f"MarkItDown instance: {self.markitdown}")
-                
-                # Check for LLM client in multiple possible locations
-                llm_client_found = False
-                llm_client = None
-                
-                if hasattr(self.markitdown, 'llm_client') and self.markitdown.llm_client:
-                    llm_client = self.markitdown.llm_client
-                    llm_client_found = True
-                    self.tool_base.log_info(f"LLM client found at llm_client: {llm_client}")
-                elif hasattr(self.markitdown, '_llm_client') and self.markitdown._llm_client:
-                    llm_client = self.markitdown._llm_client
-                    llm_client_found = True
-                    self.tool_base.log_info(f"LLM client found at _llm_client: {llm_client}")
-                else:
-                    self.tool_base.log_info("No LLM client found")
-                
-                self.tool_base.log_info(f"LLM client available: {llm_client_found}")
-                
-                # Check what converters are available and which one will be used
-                try:
-                    converters = getattr(self.markitdown, '_converters', [])
-                    if isinstance(converters, list):
-                        converter_names = []
-                        for conv in converters:
-                            try:
-                                # Try to get converter name/type
-                                conv_name = str(type(conv).__name__)
-                                converter_names.append(conv_name)
-                            except:
-                                converter_names.append(str(conv))
-                        self.tool_base.log_info(f"Available converters: {converter_names}")
-                        
-                        # Try to determine which converter will be used for this file
-                        file_ext = Path(filename).suffix.lower()
-                        self.tool_base.log_info(f"File extension: {file_ext}")
-                        
-                        # Look for PDF-specific converter
-                        pdf_converters = [conv for conv in converter_names if 'pdf' in conv.lower() or 'Pdf' in conv]
-                        if pdf_converters:
-                            self.tool_base.log_info(f"PDF converters found: {pdf_converters}")
-                        else:
-                            self.tool_base.log_info("No obvious PDF converters found")
-                            
-                    elif isinstance(converters, dict):
-                        self.tool_base.log_info(f"Available converters (dict): {list(converters.keys())}")
-                    else:
-                        self.tool_base.log_info(f"Converters type: {type(converters)}, value: {converters}")
-                except Exception as e:
-                    self.tool_base.log_info(f"Could not get converters: {e}")
-                
-                # Also check for other converter-related attributes
-                try:
-                    for attr in ['converters', 'converter_registry', '_converter_registry']:
-                        if hasattr(self.markitdown, attr):
-                            attr_value = getattr(self.markitdown, attr)
-                            self.tool_base.log_info(f"MarkItDown.{attr}: {type(attr_value)} = {attr_value}")
-                except Exception as e:
-                    self.tool_base.log_info(f"Error checking converter attributes: {e}")
+                self.tool_base.log_info(f"LLM client available: {llm_client is not None} ({llm_client})")
+                self._log_converters(ext)
             
-            result = self.markitdown.convert_stream(
-                file_stream,
-                file_extension=Path(filename).suffix.lower(),
-                filename=filename
-            )
+            markdown = title = None
+            has_text = None
+            # Set when a scanned PDF needed OCR that produced nothing (e.g. an LLM
+            # timeout), so that the result is not cached and a retry tries again
+            ocr_failed = False
+            if ext in TEXT_EXTENSIONS or media_type in TEXT_CONTENT_TYPES:
+                # Already Markdown (or plain text): decode directly instead of going
+                # through MarkItDown's converter dispatch
+                if file_content is None:
+                    file_content = await asyncio.to_thread(_read_stream, file_stream)
+                markdown = await asyncio.to_thread(_decode_text, file_content, charset)
+            elif not self.markitdown:
+                # Text files are handled above; everything else needs MarkItDown
+                return {
+                    "success": False,
+                    "error": "MarkItDown library not available",
+                    "filename": filename
+                }
             
-            if self.tool_base:
-                self.tool_base.log_info("MarkItDown conversion completed")
-                
-                # Debug the result more thoroughly
-                self.tool_base.log_info(f"Result type: {type(result)}")
-                self.tool_base.log_info(f"Result dir: {[attr for attr in dir(result) if not attr.startswith('__')]}")
-                
-                # Check the markdown content
-                if hasattr(result, 'markdown'):
-                    markdown_content = result.markdown
-                    self.tool_base.log_info(f"Markdown content length: {len(markdown_content) if markdown_content else 0}")
-                    if markdown_content and len(markdown_content.strip()) > 0:
-                        self.tool_base.log_info(f"Markdown preview: {markdown_content[:300]}...")
-                    else:
-                        self.tool_base.log_info("Markdown is empty or whitespace only")
-                else:
-                    self.tool_base.log_info("Result has no 'markdown' attribute")
+            # PDF files should start with %PDF; the header is checked once, here
+            is_pdf = ext == '.pdf' and head.startswith(b'%PDF')
+            if ext == '.pdf' and not is_pdf and self.tool_base:
+                self.tool_base.log_warning("File does not appear to be a PDF - missing %PDF header")
+            ocr_available = bool(markdown is None and self.tool_base and is_pdf and llm_client)
+            if ocr_available:
+                if file_content is None:
+                    # PyMuPDF needs the whole document; only PDFs that may need OCR are read
+                    file_content = await asyncio.to_thread(_read_stream, file_stream)
                 
-                # Check text_content if available
-                if hasattr(result, 'text_content'):
-                    text_content = result.text_content
-                    self.tool_base.log_info(f"Text content length: {len(text_content) if text_content else 0}")
-                    if text_content and len(text_content.strip()) > 0:
-                        self.tool_base.log_info(f"Text content preview: {text_content[:300]}...")
-                    else:
-                        self.tool_base.log_info("Text content is empty or whitespace only")
-                else:
-                    self.tool_base.log_info("Result has no 'text_content' attribute")
-                  # For PDFs specifically, check if this might be a scanned/image-based PDF
-                if Path(filename).suffix.lower() == '.pdf':
-                    self.tool_base.log_info("Processing PDF file - checking for text extraction issues")
-                    
-                    # If we got empty results from a PDF, it might be scanned
-                    if (not hasattr(result, 'markdown') or not result.markdown or len(result.markdown.strip()) == 0):
-                        self.tool_base.log_info("PDF returned empty markdown - this might be a scanned/image-based PDF")
-                        self.tool_base.log_info("MarkItDown's PDF converter may not handle scanned documents well")
-                        
-                        # For now, just log this. In a future version, we could add OCR here
-                        # by converting PDF pages to images and using the LLM on those images
-                        if llm_client_found and llm_client:
-                            self.tool_base.log_info(f"LLM client is available ({type(llm_client)}) - could potentially add OCR for scanned PDFs")
-                            self.tool_base.log_info("This scanned PDF could benefit from OCR processing using the LLM")
-                            
-                            # Try to implement OCR fallback for scanned PDFs
-                            try:
-                                self.tool_base.log_info("Attempting OCR fallback for scanned PDF...")
-                                ocr_result = await self._ocr_pdf_with_fallback(file_content, llm_client)
-                                if ocr_result and ocr_result.strip():
-                                    self.tool_base.log_info(f"OCR successful! Extracted {len(ocr_result)} characters")
-                                    # Override the empty result with OCR content
-                                    result.markdown = ocr_result
-                                    result.text_content = ocr_result
-                                    self.tool_base.log_info(f"OCR result preview: {ocr_result[:200]}...")
-                                else:
-                                    self.tool_base.log_info("OCR did not extract any content")
-                            except Exception as e:
-                                self.tool_base.log_error(f"OCR fallback failed: {e}")
-                        else:
-                            self.tool_base.log_info("No LLM client available for OCR enhancement")
+                # A PDF without any text layer gives MarkItDown nothing to extract,
+                # so go straight to OCR instead of running a useless extraction pass
+                has_text = await asyncio.to_thread(_pdf_has_text, file_content)
+                if has_text is False:
+                    self.tool_base.log_info("PDF has no text layer - skipping MarkItDown and using OCR")
+                    markdown = await self._ocr_scanned_pdf(file_content, llm_client) or None
+                    ocr_failed = markdown is None
             
-            # Debug logging
-            if self.tool_base:
-                self.tool_base.log_info(f"MarkItDown result type: {type(result)}")
-                self.tool_base.log_info(f"MarkItDown result attributes: {dir(result)}")
-                self.tool_base.log_info(f"MarkItDown markdown length: {len(result.markdown) if hasattr(result, 'markdown') and result.markdown else 0}")
-                self.tool_base.log_info(f"MarkItDown title: {result.title if hasattr(result, 'title') else 'No title'}")
-                if hasattr(result, 'markdown') and result.markdown:
-                    self.tool_base.log_info(f"MarkItDown markdown preview (first 200 chars): {result.markdown[:200]}")
+            if markdown is None:
+                conversion_workers = _conversion_workers(config)
+                if conversion_workers > 0:
+                    # Parse in a worker process so that concurrent conversions are not
+                    # serialized by the GIL (the worker needs the whole file as bytes)
+                    if file_content is None:
+                        file_content = await asyncio.to_thread(_read_stream, file_stream)
+                    markdown, title = await asyncio.get_running_loop().run_in_executor(
+                        self._get_conversion_pool(conversion_workers),
+                        _convert_in_worker,
+                        file_content,
+                        ext,
+                        filename,
+                        self._worker_llm_settings
+                    )
+                    
+                    if debug:
+                        self.tool_base.log_info("MarkItDown conversion completed in a worker process")
                 else:
-                    self.tool_base.log_info("MarkItDown markdown is empty or None")
+                    # Convert using MarkItDown (synchronous parsing, so it runs in a worker
+                    # thread to keep the event loop serving other requests)
+                    result = await asyncio.to_thread(
+                        self.markitdown.convert_stream,
+                        file_stream,
+                        file_extension=ext,
+                        filename=filename
+                    )
+                    markdown, title = result.markdown, result.title
+                    
+                    if debug:
+                        self.tool_base.log_info("MarkItDown conversion completed")
+                        self._log_result(result)
+                
+                # For PDFs specifically, an empty result usually means a scanned/image-based PDF
+                if ocr_available and has_text is not False and not (markdown or '').strip():
+                    self.tool_base.log_info("PDF returned empty markdown - attempting OCR fallback for scanned PDF...")
+                    ocr_markdown = await self._ocr_scanned_pdf(file_content, llm_client)
+                    ocr_failed = not ocr_markdown
+                    markdown = ocr_markdown or markdown
             
             # Log success
             if self.tool_base:
@@ -613,19 +905,21 @@ class FileToMarkdownConverter(ToolInterface):
             # Create response
             response = {
                 "success": True,
-                "markdown": result.markdown,
-                "title": result.title,
+                "markdown": markdown,
+                "title": title,
                 "filename": filename,
                 "content_type": kwargs.get("content_type"),
-                "size": len(file_content)
+                "size": size
             }
             
             # Debug the response
-            if self.tool_base:
+            if debug:
                 self.tool_base.log_info(f"Response keys: {list(response.keys())}")
-                self.tool_base.log_info(f"Response markdown length: {len(response.get('markdown', ''))}")
+                self.tool_base.log_info(f"Response markdown length: {len(response.get('markdown') or '')}")
                 self.tool_base.log_info(f"Response structure: success={response['success']}, title='{response['title']}', size={response['size']}")
             
+            if not ocr_failed and (markdown or '').strip():
+                self._cache_conversion(cache_key, dict(response))
             return response
             
         except Exception as e:
@@ -639,6 +933,70 @@ class FileToMarkdownConverter(ToolInterface):
                 "error": error_msg,
                 "filename": filename
             }
+    
+    async def _execute_batch(self, files: Any) -> Dict[str, Any]:
+        """Convert several files concurrently, returning their results in order."""
+        if not isinstance(files, list) or not all(isinstance(item, dict) for item in files):
+            return {
+                "success": False,
+                "error": "files must be a list of objects"
+            }
+        
+        # Conversions already run off the event loop (threads or the process
+        # pool), so this only bounds how many are in flight at once
+        config = getattr(self.tool_base, 'config', {}) or {}
+        semaphore = asyncio.Semaphore(_conversion_workers(config) or os.cpu_count() or 1)
+        
+        async def convert(item: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                # Results are collected into one response, so items can neither nest
+                # batches nor stream (a chunk iterator cannot be serialized)
+                return await self.execute(**{key: value for key, value in item.items() if key not in BATCH_ITEM_EXCLUDED})
+        
+        results = await asyncio.gather(*(convert(item) for item in files))
+        return {
+            "success": True,
+            "results": results
+        }
+    
+    async def _ocr_scanned_pdf(self, file_content: bytes, llm_client) -> str:
+        """OCR a scanned PDF, returning the extracted Markdown or "" on failure."""
+        try:
+            ocr_result = await self._ocr_pdf_with_fallback(file_content, llm_client)
+            if ocr_result and ocr_result.strip():
+                self.tool_base.log_info(f"OCR successful! Extracted {len(ocr_result)} characters")
+                return ocr_result
+            self.tool_base.log_info("OCR did not extract any content")
+        except Exception as e:
+            self.tool_base.log_error(f"OCR fallback failed: {e}")
+        return ""
+    
+    def _log_converters(self, ext: str) -> None:
+        """Log which MarkItDown converters are registered (debug only)."""
+        try:
+            converters = getattr(self.markitdown, '_converters', [])
+            if isinstance(converters, list):
+                converter_names = [type(conv).__name__ for conv in converters]
+                self.tool_base.log_info(f"Available converters: {converter_names}")
+                if ext == '.pdf':
+                    pdf_converters = [name for name in converter_names if 'pdf' in name.lower()]
+                    self.tool_base.log_info(f"PDF converters found: {pdf_converters or 'none'}")
+            elif isinstance(converters, dict):
+                self.tool_base.log_info(f"Available converters (dict): {list(converters.keys())}")
+            else:
+                self.tool_base.log_info(f"Converters type: {type(converters)}, value: {converters}")
+        except Exception as e:
+            self.tool_base.log_info(f"Could not get converters: {e}")
+    
+    def _log_result(self, result) -> None:
+        """Log a summary of a MarkItDown result (debug only)."""
+        self.tool_base.log_info(f"Result type: {type(result)}")
+        for attr in ('markdown', 'text_content'):
+            content = getattr(result, attr, None)
+            self.tool_base.log_info(f"Result {attr} length: {len(content) if content else 0}")
+            if content and content.strip():
+                self.tool_base.log_info(f"Result {attr} preview: {content[:300]}...")
+        self.tool_base.log_info(f"Result title: {getattr(result, 'title', 'No title')}")
 
 
 def setup_tool(tool_base):
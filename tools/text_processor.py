@@ -5,109 +5,217 @@ This tool provides various text processing capabilities.
 It's completely self-contained with no imports from the core service.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from itertools import islice
+import io
+from pathlib import Path
+import importlib.util
+import sys
 import re
 
-class ToolDefinition:
-    """Definition structure for a tool."""
-    
-    def __init__(self, name: str, description: str, endpoint: str, tool_type: str, version: str = "1.0.0"):
-        self.name = name
-        self.description = description
-        self.endpoint = endpoint
-        self.tool_type = tool_type  # Now accepts any string
-        self.version = version
-    
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            "name": self.name,
-            "description": self.description,
-            "endpoint": self.endpoint,
-            "type": self.tool_type,  # Direct string value
-            "version": self.version
-        }
-
-
-class ToolSchema:
-    """Schema definition for tool parameters."""
-    
-    def __init__(self, properties: Dict[str, Any], required: list = None):
-        self.properties = properties
-        self.required = required or []
-    
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            "type": "object",
-            "properties": self.properties,
-            "required": self.required
-        }
+# Shared tool classes from _base.py next to this file, loaded by path under a
+# namespaced name and registered once in sys.modules, so that every tool shares
+# the same classes without the tools directory being put on sys.path
+_base = sys.modules.get("fastapi_mcp_tools._base")
+if _base is None:
+    _base_spec = importlib.util.spec_from_file_location("fastapi_mcp_tools._base", Path(__file__).with_name("_base.py"))
+    _base = importlib.util.module_from_spec(_base_spec)
+    _base_spec.loader.exec_module(_base)
+    # Tools load concurrently, so keep whichever copy was registered first
+    _base = sys.modules.setdefault(_base_spec.name, _base)
+ToolDefinition, ToolSchema, ToolInterface = _base.ToolDefinition, _base.ToolSchema, _base.ToolInterface
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+HTML_PATTERN = r'<[^>]+>'
+EMAIL_PATTERN = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b'
+
+# Patterns compiled once at import time instead of being looked up per call
+_WS = re.compile(r'\s+')
+_HTML = re.compile(HTML_PATTERN)
+# EMAIL_PATTERN retries the local part at every word boundary of a long run
+# like "a.a.a.a...", which is quadratic. This equivalent form (Hyperscan does
+# not support possessive quantifiers) only starts at the run's first boundary;
+# the address is group 1
+_EMAIL = re.compile(
+    r'(?<![A-Za-z0-9._%+-])(?:(?<=\w)[A-Za-z0-9_]*+|[.%+-]*+)'
+    r'\b([A-Za-z0-9._%+-]++@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b)'
+)
+
+# Inputs at least this long are scanned with Hyperscan when it is installed;
+# below that, its per-match Python callback costs more than the faster scan saves
+HYPERSCAN_MIN_LENGTH = 64 * 1024
 
 
-class ToolInterface:
-    """Interface that tools must implement."""
+def _hs_database(pattern: str):
+    """Compile a block-mode Hyperscan database reporting leftmost match starts."""
+    if hyperscan is None:
+        return None
+    try:
+        db = hyperscan.Database()
+        db.compile(
+            expressions=[pattern.encode('ascii')],
+            ids=[0],
+            elements=1,
+            flags=hyperscan.HS_FLAG_SOM_LEFTMOST | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP
+        )
+        return db
+    except Exception:
+        # Unsupported platform or pattern; the re fallback is used instead
+        return None
+
+
+_HS_HTML = _hs_database(HTML_PATTERN)
+_HS_EMAIL = _hs_database(EMAIL_PATTERN)
+
+
+def _hs_spans(db, data: bytes) -> list:
+    """Scan data, returning the leftmost-longest non-overlapping match spans like re."""
+    # Hyperscan reports every match end, so keep the longest match per start
+    ends = {}
     
-    def get_definition(self) -> ToolDefinition:
-        raise NotImplementedError
+    def on_match(_id, start, end, _flags, _context):
+        if end > ends.get(start, -1):
+            ends[start] = end
     
-    def get_schema(self) -> ToolSchema:
-        raise NotImplementedError
+    db.scan(data, match_event_handler=on_match)
     
-    async def execute(self, **kwargs) -> Dict[str, Any]:
-        raise NotImplementedError
+    spans = []
+    last_end = 0
+    for start in sorted(ends):
+        if start >= last_end:
+            last_end = ends[start]
+            spans.append((start, last_end))
+    return spans
+
+
+def _scan_bytes(db, text: str) -> Optional[bytes]:
+    """Get text as UTF-8 if it should be scanned with the given Hyperscan database."""
+    if db is None or len(text) < HYPERSCAN_MIN_LENGTH:
+        return None
+    try:
+        return text.encode('utf-8')
+    except UnicodeEncodeError:
+        # Lone surrogates cannot be scanned as UTF-8
+        return None
+
+
+def _remove_html(text: str) -> str:
+    """Remove HTML tags from text."""
+    if LexborHTMLParser is not None and text:
+        # A real HTML5 parser also handles comments, '>' inside attribute values and
+        # entities; script and style contents are dropped rather than kept as text
+        tree = LexborHTMLParser(text)
+        tree.strip_tags(["script", "style"])
+        return tree.text(separator='')
+    data = _scan_bytes(_HS_HTML, text)
+    if data is None:
+        return _HTML.sub('', text)
+    # Keep the bytes between the tag spans
+    parts = []
+    last_end = 0
+    for start, end in _hs_spans(_HS_HTML, data):
+        parts.append(data[last_end:start])
+        last_end = end
+    parts.append(data[last_end:])
+    return b''.join(parts).decode('utf-8')
+
+
+def _extract_emails(text: str, limit: Optional[int] = None) -> str:
+    """Extract email addresses from text, one per line, stopping after limit matches."""
+    if limit is not None:
+        limit = max(int(limit), 0)
+    data = _scan_bytes(_HS_EMAIL, text)
+    if data is None:
+        # Matches are written out as finditer yields them, with no list of match
+        # strings in between; finditer stops scanning once the limit is reached
+        buf = io.StringIO()
+        for index, match in enumerate(islice(_EMAIL.finditer(text), limit)):
+            if index:
+                buf.write("\n")
+            buf.write(match.group(1))
+        return buf.getvalue()
+    buf = bytearray()
+    for start, end in _hs_spans(_HS_EMAIL, data)[:limit]:
+        if buf:
+            buf += b"\n"
+        buf += data[start:end]
+    return buf.decode('utf-8')
+
+
+# Text operations by name: (function, names of the optional arguments it takes)
+_OPS = {
+    "clean": (lambda text: _WS.sub(' ', text.strip()), ()),
+    "uppercase": (lambda text: text.upper(), ()),
+    "lowercase": (lambda text: text.lower(), ()),
+    "remove_html": (_remove_html, ()),
+    "extract_emails": (_extract_emails, ("limit",)),
+}
 
 
 class TextProcessor(ToolInterface):
     """Process text with various operations."""
     
+    # Tool metadata is static, so it is built once and shared by every call
+    _DEFINITION = ToolDefinition(
+        name="text_processor",
+        description="Process text with various operations like cleaning, formatting, etc.",
+        endpoint="/process",
+        tool_type="processor",  # Direct string instead of enum
+        version="1.0.0"
+    )
+    
+    _SCHEMA = ToolSchema(
+        properties={
+            "text": {
+                "type": "string",
+                "description": "Input text to process"
+            },
+            "operation": {
+                "type": "string",
+                "enum": ["clean", "uppercase", "lowercase", "remove_html", "extract_emails"],
+                "description": "Type of processing to perform"
+            },
+            "limit": {
+                "type": "integer",
+                "minimum": 0,
+                "description": "Maximum number of addresses returned by extract_emails"
+            }
+        },
+        required=["text", "operation"]
+    )
+    
     def __init__(self, tool_base):
         self.tool_base = tool_base
     
     def get_definition(self) -> ToolDefinition:
-        return ToolDefinition(
-            name="text_processor",
-            description="Process text with various operations like cleaning, formatting, etc.",
-            endpoint="/process",
-            tool_type="processor",  # Direct string instead of enum
-            version="1.0.0"
-        )
+        return self._DEFINITION
     
     def get_schema(self) -> ToolSchema:
-        return ToolSchema(
-            properties={
-                "text": {
-                    "type": "string",
-                    "description": "Input text to process"
-                },
-                "operation": {
-                    "type": "string",
-                    "enum": ["clean", "uppercase", "lowercase", "remove_html", "extract_emails"],
-                    "description": "Type of processing to perform"
-                }
-            },
-            required=["text", "operation"]
-        )
+        return self._SCHEMA
     
     async def execute(self, **kwargs) -> Dict[str, Any]:
         text = kwargs.get("text", "")
         operation = kwargs.get("operation", "clean")
         
         try:
-            if operation == "clean":
-                result = re.sub(r'\s+', ' ', text.strip())
-            elif operation == "uppercase":
-                result = text.upper()
-            elif operation == "lowercase":
-                result = text.lower()
-            elif operation == "remove_html":
-                result = re.sub(r'<[^>]+>', '', text)
-            elif operation == "extract_emails":
-                emails = re.findall(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', text)
-                result = "\n".join(emails)
-            else:
+            op = _OPS.get(operation)
+            if op is None:
                 return {
                     "success": False,
                     "error": f"Unknown operation: {operation}"
                 }
+            operation_fn, option_names = op
+            options = {name: kwargs[name] for name in option_names if kwargs.get(name) is not None}
+            result = operation_fn(text, **options)
             
             if self.tool_base:
                 self.tool_base.log_info(f"Text processing completed: {operation}")
@@ -5,96 +5,232 @@ This tool fetches content from URLs and can convert web pages to markdown.
 It's completely self-contained with no imports from the core service.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional, List
+from collections import OrderedDict
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+from pathlib import Path
 import asyncio
+import importlib.util
+import sys
+import re
+import time
+
+# Shared tool classes from _base.py next to this file, loaded by path under a
+# namespaced name and registered once in sys.modules, so that every tool shares
+# the same classes without the tools directory being put on sys.path
+_base = sys.modules.get("fastapi_mcp_tools._base")
+if _base is None:
+    _base_spec = importlib.util.spec_from_file_location("fastapi_mcp_tools._base", Path(__file__).with_name("_base.py"))
+    _base = importlib.util.module_from_spec(_base_spec)
+    _base_spec.loader.exec_module(_base)
+    # Tools load concurrently, so keep whichever copy was registered first
+    _base = sys.modules.setdefault(_base_spec.name, _base)
+ToolDefinition, ToolSchema, ToolInterface = _base.ToolDefinition, _base.ToolSchema, _base.ToolInterface
+
 try:
     import aiohttp
+    from aiohttp import compression_utils
+    from yarl import URL
 except ImportError:
     aiohttp = None
+    compression_utils = None
 
+try:
+    # c-ares resolver, so DNS lookups do not occupy the default thread pool
+    import aiodns
+except ImportError:
+    aiodns = None
 
-class ToolDefinition:
-    """Definition structure for a tool."""
-    
-    def __init__(self, name: str, description: str, endpoint: str, tool_type: str, version: str = "1.0.0"):
-        self.name = name
-        self.description = description
-        self.endpoint = endpoint
-        self.tool_type = tool_type  # Now accepts any string
-        self.version = version
-    
-    def to_dict(self) -> Dict[str, Any]:        return {
-            "name": self.name,
-            "description": self.description,
-            "endpoint": self.endpoint,
-            "type": self.tool_type,  # Direct string value
-            "version": self.version
-        }
+# Content encodings aiohttp can decompress in this install (brotli and zstd
+# need their optional packages, zstd also a recent aiohttp)
+ACCEPT_ENCODING = ", ".join(
+    ["gzip", "deflate"]
+    + (["br"] if getattr(compression_utils, "HAS_BROTLI", False) else [])
+    + (["zstd"] if getattr(compression_utils, "HAS_ZSTD", False) else [])
+)
 
+# Response bodies are read in chunks of this size, up to max_bytes in total (if set)
+READ_CHUNK_SIZE = 64 * 1024
 
-class ToolSchema:
-    """Schema definition for tool parameters."""
-    
-    def __init__(self, properties: Dict[str, Any], required: list = None):
-        self.properties = properties
-        self.required = required or []
-    
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            "type": "object",
-            "properties": self.properties,
-            "required": self.required
-        }
+# Responses kept for conditional re-fetching, and the largest body kept
+CACHE_MAX_ENTRIES = 256
+CACHE_MAX_BODY_BYTES = 1024 * 1024
 
+_MAX_AGE = re.compile(r'max-age=(\d+)')
+
+
+@dataclass(slots=True)
+class _CacheEntry:
+    """A cached response with its validators and freshness deadline."""
+    etag: Optional[str]
+    last_modified: Optional[str]
+    result: Dict[str, Any]
+    expires_at: float
+    body_size: int
 
-class ToolInterface:
-    """Interface that tools must implement."""
-    
-    def get_definition(self) -> ToolDefinition:
-        raise NotImplementedError
-    
-    def get_schema(self) -> ToolSchema:
-        raise NotImplementedError
-    
-    async def execute(self, **kwargs) -> Dict[str, Any]:
-        raise NotImplementedError
+
+def _expires_at(headers) -> Optional[float]:
+    """Get the monotonic time a response stays fresh until, or None if it must not be stored."""
+    cache_control = headers.get("Cache-Control", "").lower()
+    if "no-store" in cache_control:
+        return None
+    now = time.monotonic()
+    if "no-cache" in cache_control:
+        return now
+    match = _MAX_AGE.search(cache_control)
+    return now + int(match.group(1)) if match else now
 
 
 class URLFetcher(ToolInterface):
     """Fetch content from URLs."""
     
+    # Tool metadata is static, so it is built once and shared by every call
+    _DEFINITION = ToolDefinition(
+        name="url_fetcher",
+        description="Fetch content from URLs and optionally convert to markdown",
+        endpoint="/fetch",
+        tool_type="fetcher",  # Direct string instead of enum
+        version="1.0.0"
+    )
+    
+    _SCHEMA = ToolSchema(
+        properties={
+            "url": {
+                "type": "string",
+                "format": "uri",
+                "description": "URL to fetch content from"
+            },
+            "timeout": {
+                "type": "integer",
+                "default": 30,
+                "description": "Request timeout in seconds"
+            },
+            "user_agent": {
+                "type": "string",
+                "default": "MCP-URL-Fetcher/1.0",
+                "description": "User agent string"
+            },
+            "max_bytes": {
+                "type": "integer",
+                "description": "Maximum decompressed response size in bytes (no limit if omitted)"
+            },
+            "prewarm": {
+                "type": "array",
+                "items": {"type": "string", "format": "uri"},
+                "description": "URLs about to be fetched; connections to their hosts are opened in the background (no request is sent)"
+            }
+        },
+        required=["url"]
+    )
+    
+    # Concurrent fetches of the same URL with the same options share one request
+    coalesce_calls = True
+    
     def __init__(self, tool_base):
         self.tool_base = tool_base
+        # Shared across calls for connection keep-alive and DNS caching
+        self._session: Optional["aiohttp.ClientSession"] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        # LRU cache: (url, user agent) -> last response and its validators
+        self._cache: "OrderedDict[tuple, _CacheEntry]" = OrderedDict()
+        # Background prewarm tasks, referenced until done so they are not collected
+        self._prewarm_tasks: set = set()
+    
+    async def _get_session(self) -> "aiohttp.ClientSession":
+        """Get the shared client session, creating it on first use in the running loop."""
+        loop = asyncio.get_running_loop()
+        stale, stale_loop = self._session, self._session_loop
+        if stale is None or stale.closed or stale_loop is not loop:
+            # The resolver binds to the running loop, so it is created along with the session
+            resolver = aiohttp.AsyncResolver() if aiodns is not None else None
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=100, ttl_dns_cache=300, enable_cleanup_closed=True, resolver=resolver
+                ),
+                # Fetches stay independent of each other, as with a session per call
+                cookie_jar=aiohttp.DummyCookieJar()
+            )
+            self._session_loop = loop
+            # The new session is already in place, so concurrent calls cannot race
+            # on this await
+            if stale is not None and not stale.closed:
+                await self._close_stale_session(stale, stale_loop)
+        return self._session
+    
+    @staticmethod
+    async def _close_stale_session(session: "aiohttp.ClientSession",
+                                   session_loop: asyncio.AbstractEventLoop) -> None:
+        """Close a session left behind by another event loop."""
+        if session_loop.is_running():
+            # Still running in another thread, so close the session over there
+            asyncio.run_coroutine_threadsafe(session.close(), session_loop)
+            return
+        try:
+            # Connections of a closed loop are just marked closed
+            await session.close()
+        except RuntimeError:
+            # Bound to a loop that can no longer run; at least drop the connector
+            session.detach()
     
-    def get_definition(self) -> ToolDefinition:        return ToolDefinition(
-            name="url_fetcher",
-            description="Fetch content from URLs and optionally convert to markdown",
-            endpoint="/fetch",
-            tool_type="fetcher",  # Direct string instead of enum
-            version="1.0.0"
-        )
+    async def prewarm(self, urls: List[str], timeout: float = 10) -> None:
+        """Resolve and connect to the hosts of urls ahead of fetching them.
+        
+        Opens one connection per origin through the session's connector (DNS,
+        TCP and TLS done) and leaves it in the keep-alive pool for the following
+        fetch. No HTTP request is sent. Failures are ignored; the real fetch
+        reports them.
+        """
+        origins = {
+            f"{parts.scheme}://{parts.netloc.lower()}"
+            for parts in map(urlsplit, urls)
+            if parts.scheme in ("http", "https") and parts.netloc
+        }
+        if not origins:
+            return
+        
+        session = await self._get_session()
+        loop = asyncio.get_running_loop()
+        timeout_obj = aiohttp.ClientTimeout(connect=timeout)
+        
+        async def warm(origin: str) -> None:
+            # A request object only describes the connection to open; it is never sent
+            request = aiohttp.ClientRequest("GET", URL(origin), loop=loop)
+            connection = await session.connector.connect(request, [], timeout_obj)
+            connection.release()
+        
+        await asyncio.gather(*(warm(origin) for origin in origins), return_exceptions=True)
+    
+    async def close(self) -> None:
+        """Close the shared client session."""
+        for task in self._prewarm_tasks:
+            task.cancel()
+        self._prewarm_tasks.clear()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+    
+    def _store(self, cache_key: tuple, response, result: Dict[str, Any], body_size: int) -> None:
+        """Cache a successful response that can be reused or revalidated."""
+        self._cache.pop(cache_key, None)
+        if response.status != 200 or body_size > CACHE_MAX_BODY_BYTES:
+            return
+        expires_at = _expires_at(response.headers)
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if expires_at is None or (expires_at <= time.monotonic() and not (etag or last_modified)):
+            # Neither fresh for a while nor revalidatable
+            return
+        self._cache[cache_key] = _CacheEntry(etag, last_modified, result, expires_at, body_size)
+        while len(self._cache) > CACHE_MAX_ENTRIES:
+            self._cache.popitem(last=False)
+    
+    def get_definition(self) -> ToolDefinition:
+        return self._DEFINITION
     
     def get_schema(self) -> ToolSchema:
-        return ToolSchema(
-            properties={
-                "url": {
-                    "type": "string",
-                    "format": "uri",
-                    "description": "URL to fetch content from"
-                },
-                "timeout": {
-                    "type": "integer",
-                    "default": 30,
-                    "description": "Request timeout in seconds"
-                },
-                "user_agent": {
-                    "type": "string",
-                    "default": "MCP-URL-Fetcher/1.0",
-                    "description": "User agent string"
-                }
-            },
-            required=["url"]
-        )
+        return self._SCHEMA
     
     async def execute(self, **kwargs) -> Dict[str, Any]:
         if not aiohttp:
@@ -112,27 +248,77 @@ class URLFetcher(ToolInterface):
         
         timeout = kwargs.get("timeout", 30)
         user_agent = kwargs.get("user_agent", "MCP-URL-Fetcher/1.0")
+        max_bytes = kwargs.get("max_bytes")
+        
+        prewarm_urls = kwargs.get("prewarm")
+        if prewarm_urls:
+            # Overlap the setup of upcoming connections with this fetch
+            task = asyncio.create_task(self.prewarm(prewarm_urls, timeout))
+            self._prewarm_tasks.add(task)
+            task.add_done_callback(self._prewarm_tasks.discard)
+        
+        cache_key = (url, user_agent)
+        entry = self._cache.get(cache_key)
+        if entry is not None and max_bytes is not None and entry.body_size > max_bytes:
+            # Cached for a caller with a higher limit; fetch again so the limit applies
+            entry = None
+        if entry is not None:
+            self._cache.move_to_end(cache_key)
+            if entry.expires_at > time.monotonic():
+                return {**entry.result, "cached": True}
         
         try:
             timeout_obj = aiohttp.ClientTimeout(total=timeout)
-            headers = {"User-Agent": user_agent}
+            headers = {"User-Agent": user_agent, "Accept-Encoding": ACCEPT_ENCODING}
+            if entry is not None:
+                # Revalidate instead of downloading an unchanged body again
+                if entry.etag:
+                    headers["If-None-Match"] = entry.etag
+                if entry.last_modified:
+                    headers["If-Modified-Since"] = entry.last_modified
             
-            async with aiohttp.ClientSession(timeout=timeout_obj) as session:
-                async with session.get(url, headers=headers) as response:
-                    content = await response.text()
-                    
+            session = await self._get_session()
+            async with session.get(url, headers=headers, timeout=timeout_obj) as response:
+                if response.status == 304 and entry is not None:
+                    entry.expires_at = _expires_at(response.headers) or time.monotonic()
                     if self.tool_base:
-                        self.tool_base.log_info(f"Successfully fetched URL: {url}")
-                    
-                    return {
-                        "success": True,
-                        "url": url,
-                        "status_code": response.status,
-                        "content_type": response.headers.get("content-type", "unknown"),
-                        "content": content,
-                        "content_length": len(content),
-                        "headers": dict(response.headers)
-                    }
+                        self.tool_base.log_info(f"URL not modified, using cached content: {url}")
+                    return {**entry.result, "cached": True}
+                
+                # Read the (transparently decompressed) body in chunks, aborting
+                # oversize responses instead of buffering them whole
+                body = bytearray()
+                async for chunk in response.content.iter_chunked(READ_CHUNK_SIZE):
+                    body.extend(chunk)
+                    if max_bytes is not None and len(body) > max_bytes:
+                        error_msg = f"Response from {url} exceeds {max_bytes} bytes"
+                        if self.tool_base:
+                            self.tool_base.log_error(error_msg)
+                        return {
+                            "success": False,
+                            "error": error_msg,
+                            "url": url
+                        }
+                try:
+                    content = body.decode(response.charset or 'utf-8', errors='replace')
+                except LookupError:
+                    # Unknown charset label in the Content-Type header
+                    content = body.decode('utf-8', errors='replace')
+                
+                if self.tool_base:
+                    self.tool_base.log_info(f"Successfully fetched URL: {url}")
+                
+                result = {
+                    "success": True,
+                    "url": url,
+                    "status_code": response.status,
+                    "content_type": response.headers.get("content-type", "unknown"),
+                    "content": content,
+                    "content_length": len(content),
+                    "headers": dict(response.headers)
+                }
+                self._store(cache_key, response, result, len(body))
+                return {**result, "cached": False}
                     
         except asyncio.TimeoutError:
             error_msg = f"Timeout fetching URL: {url}"